@@ -4,11 +4,23 @@ pydecodr.ciphers.classical.affine - affine cipher
 Encryption: E(x) = (ax + b) mod 26
 Decryption: D(x) = a_inv * (x - b) mod 26
 a is the modular inverse of a mod 26
+
+crack precomputes the 312 decryption tables (12 values of a x 26 of b)
+once, turns the ciphertext into all 312 candidates with a single gather
+and scores them in bulk. With a known plaintext the key is solved
+directly from two letter pairs.
 """
 from __future__ import annotations
 
 import sys
 import argparse
+import string
+from functools import lru_cache
+import numpy as np
+from pydecodr.utils import scoring
+
+VALID_A = (1, 3, 5, 7, 9, 11, 15, 17, 19, 21, 23, 25)
+KEYS = [(a, b) for a in VALID_A for b in range(26)]
 
 
 def _char_to_num(ch: str) -> int:
@@ -19,51 +31,70 @@ def _num_to_char(n: int, upper: bool) -> str:
     return chr((n % 26) + base)
 
 def _modinv(a: int, m: int) -> int:
-    a = a % m
-    for x in range(1, m):
-        if (a * x) % m == 1:
-            return x
-    raise ValueError(f"There is no modular inverse for a={a} mod {m}")
+    try:
+        return pow(a % m, -1, m)
+    except ValueError:
+        raise ValueError(f"There is no modular inverse for a={a} mod {m}") from None
+
+def _decrypt_tables() -> np.ndarray:
+    y = np.arange(26)
+    return np.array([(_modinv(a, 26) * (y - b)) % 26 for a, b in KEYS], dtype=np.uint8)
+
+DECRYPT_TABLES = _decrypt_tables()
+
+@lru_cache(maxsize=None)
+def _table(a: int, b: int, inverse: bool) -> dict:
+    if inverse:
+        a_inv = _modinv(a, 26)
+        mapping = [a_inv * (y - b) % 26 for y in range(26)]
+    else:
+        mapping = [(a * x + b) % 26 for x in range(26)]
+    lo = "".join(_num_to_char(n, False) for n in mapping)
+    return str.maketrans(string.ascii_letters, lo + lo.upper())
 
 def encrypt(plaintext: str, a: int = 5, b: int = 8) -> str:
-    result = []
-    for ch in plaintext:
-        if ch.isalpha() and ch.isascii():
-            upper = ch.isupper()
-            x = _char_to_num(ch)
-            y = (a * x + b) % 26
-            result.append(_num_to_char(y, upper))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return plaintext.translate(_table(a % 26, b % 26, False))
 
 def decrypt(ciphertext: str, a: int = 5, b: int = 8) -> str:
-    result = []
-    a_inv = _modinv(a, 26)
-    for ch in ciphertext:
-        if ch.isalpha() and ch.isascii():
-            upper = ch.isupper()
-            y = _char_to_num(ch)
-            x = (a_inv * (y - b) % 26)
-            result.append(_num_to_char(x, upper))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return ciphertext.translate(_table(a % 26, b % 26, True))
 
 encode = encrypt
 decode = decrypt
 
-def crack(ciphertex: str) -> list[tuple[int, int, str]]:
-    valid_a = [1,3,5,7,9,11,15,17,19,21,23,25]
-    results: list[tuple[int, int, str]] = []
-    for a in valid_a:
-        for b in range(26):
+def solve_known(plaintext: str, ciphertext: str) -> tuple[int, int]:
+    """Recover (a, b) from aligned plaintext/ciphertext letters."""
+    p = scoring.letter_indices(plaintext).tolist()
+    c = scoring.letter_indices(ciphertext).tolist()
+    pairs = list(zip(p, c))
+    for i, (p1, c1) in enumerate(pairs):
+        for p2, c2 in pairs[i + 1:]:
             try:
-                pt = decrypt(ciphertex, a, b)
-                results.append((a, b, pt))
-            except Exception:
+                a = (c1 - c2) * _modinv(p1 - p2, 26) % 26
+            except ValueError:
                 continue
-    return results
+            b = (c1 - a * p1) % 26
+            if a in VALID_A and all((a * x + b) % 26 == y for x, y in pairs):
+                return a, b
+            raise ValueError("Known plaintext does not match any affine key")
+    raise ValueError("Need two known letters whose difference is invertible mod 26")
+
+def crack(ciphertext: str, known_plaintext: str | None = None, method: str = "quadgram",
+          limit: int | None = None) -> list[tuple[int, int, str, float]]:
+    if known_plaintext:
+        a, b = solve_known(known_plaintext, ciphertext)
+        pt = decrypt(ciphertext, a, b)
+        return [(a, b, pt, scoring.quadgram_score(pt))]
+    if method not in ("quadgram", "chi2"):
+        raise ValueError("method must be 'quadgram' or 'chi2'")
+
+    rows = DECRYPT_TABLES[:, scoring.letter_indices(ciphertext)]
+    if method == "quadgram":
+        scores = scoring.quadgram_scores(rows)
+    else:
+        scores = -scoring.chi_squared(scoring.row_letter_counts(rows))
+
+    ranked = np.argsort(-scores, kind="stable")[:limit]
+    return [(*KEYS[k], decrypt(ciphertext, *KEYS[k]), float(scores[k])) for k in ranked]
 
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -75,6 +106,9 @@ def _build_argparser() -> argparse.ArgumentParser:
     p.add_argument("text", help="plaintext (for encrypt) or ciphertext (for decrypt/crack)")
     p.add_argument("a", nargs="?", type=int, default=5, help="multiplicative key 'a' (default: 5)")
     p.add_argument("b", nargs="?", type=int, default=8, help="additive key 'b' (default: 8)")
+    p.add_argument("--known", default=None, help="known plaintext prefix, solves (a, b) directly (crack)")
+    p.add_argument("--method", choices=["quadgram", "chi2"], default="quadgram", help="crack scoring method (default: quadgram)")
+    p.add_argument("--top", type=int, default=None, help="only show the best N keys (crack)")
     
     return p
 
@@ -95,8 +129,8 @@ if __name__ == "__main__":
             print(decrypt(text, a, b))
             sys.exit(0)
         elif action == "crack":
-            for a_val, b_val, pt in crack(text):
-                print(f"a={a_val:2d}, b={b_val:2d} -> {pt}")
+            for a_val, b_val, pt, score in crack(text, known_plaintext=args.known, method=args.method, limit=args.top):
+                print(f"a={a_val:2d}, b={b_val:2d} ({score:9.2f}) -> {pt}")
             sys.exit(0)
         else:
             parser.print_help()
@@ -4,12 +4,21 @@ pydecodr.ciphers.classical.caesar - Caesar cipher - a monoalphabetic shift
 Features:
 - encrypt or decript using a integer shift
 - non-letters are gonna be preserved as is
+- crack ranks all 26 shifts at once: the letters become one uint8 array,
+  a single broadcast builds the 26xN shift matrix and every row is
+  scored in one call
 """
 
 from __future__ import annotations
 
 import sys
 import argparse
+import string
+from functools import lru_cache
+import numpy as np
+from pydecodr.utils import scoring
+
+SHIFTS = np.arange(26, dtype=np.uint8)
 
 def _shift_char(ch: str, shift: int) -> str:
     if "a" <= ch <= "z":
@@ -20,20 +29,30 @@ def _shift_char(ch: str, shift: int) -> str:
         return chr((ord(ch) - base + shift) % 26 + base)
     return ch
 
+@lru_cache(maxsize=26)
+def _table(shift: int) -> dict:
+    letters = string.ascii_letters
+    return str.maketrans(letters, "".join(_shift_char(ch, shift) for ch in letters))
+
 def encrypt(plaintext: str, shift: int = 3) -> str:
-    s = shift % 26
-    return "".join(_shift_char(ch, s) for ch in plaintext)
+    return plaintext.translate(_table(shift % 26))
 
 def decrypt(ciphertext: str, shift: int = 3) -> str:
-    s = (-shift)%26
-    return "".join(_shift_char(ch, s) for ch in ciphertext)
-    
-def crack(ciphertext: str) -> list[tuple[int, str]]:
-    results: list[tuple[int, str]] = []
-    for sh in range(26):
-        pt = decrypt(ciphertext, shift=sh)
-        results.append((sh, pt))
-    return results
+    return ciphertext.translate(_table((-shift) % 26))
+
+def crack(ciphertext: str, method: str = "quadgram", limit: int | None = None) -> list[tuple[int, str, float]]:
+    if method not in ("quadgram", "chi2"):
+        raise ValueError("method must be 'quadgram' or 'chi2'")
+
+    idx = scoring.letter_indices(ciphertext)
+    rows = (idx[None, :] + (26 - SHIFTS)[:, None]) % 26
+    if method == "quadgram":
+        scores = scoring.quadgram_scores(rows)
+    else:
+        scores = -scoring.chi_squared(scoring.row_letter_counts(rows))
+
+    ranked = np.argsort(-scores, kind="stable")[:limit]
+    return [(int(sh), decrypt(ciphertext, int(sh)), float(scores[sh])) for sh in ranked]
 
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -43,6 +62,7 @@ def _build_argparser() -> argparse.ArgumentParser:
     p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help="action to perform")
     p.add_argument("text", help="plaintext or ciphertext (quote if it contains spaces)")
     p.add_argument("shift", nargs="?", type=int, default=3, help="shift amount (default: 3)")
+    p.add_argument("--method", choices=["quadgram", "chi2"], default="quadgram", help="crack scoring method (default: quadgram)")
     return p
 
 if __name__ == "__main__":
@@ -61,8 +81,8 @@ if __name__ == "__main__":
             print(decrypt(text, shift=shift))
             sys.exit(0)
         elif action == "crack":
-            for sh, pt in crack(text):
-                print(f"{sh:2d}: {pt}")
+            for sh, pt, score in crack(text, method=args.method):
+                print(f"{sh:2d} ({score:9.2f}): {pt}")
             sys.exit(0)
         else:
             parser.print_help()
@@ -1,7 +1,26 @@
 """
-pydecodr.ciphers.classical.hill -  hill cipher (2x2 and 3x3)
+pydecodr.ciphers.classical.hill -  hill cipher (n x n)
+
+Keys can be any invertible n x n matrix mod 26, the inverse comes from
+Gauss-Jordan elimination mod 26. A whole text is processed at once: the
+letters are reshaped into a (blocks, n) matrix and multiplied by the key
+with a single @ followed by % 26.
+
+crack() recovers keys three ways. With known plaintext the key is solved
+by Gaussian elimination mod 26 (Euclid steps pick the pivots, so even
+rows are handled). A 2x2 key is found exhaustively: all 157248 invertible
+decryption matrices are applied to the ciphertext blocks as batched
+matmuls and scored with quadgrams. Larger keys are attacked row by row:
+each decryption row gives every n-th plaintext letter on its own, so the
+26^n candidate rows are ranked by letter frequencies and only
+permutations of the best rows are tried as full keys.
 """
 from __future__ import annotations
+from functools import lru_cache
+from itertools import permutations
+import math
+import numpy as np
+from pydecodr.utils import scoring
 
 ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 ALPHABET_SET = set(ALPHABET)
@@ -59,16 +78,14 @@ def parse_matrix(key_str):
     
     if len(rows) == 1:
         flat = rows[0]
-        if len(flat) == 4:
-            rows = [flat[:2], flat[2:]]
-        elif len(flat) == 9:
-            rows = [flat[0:3], flat[3:6], flat[6:9]]
-        else:
-            raise ValueError("Key needs 4 numbers or 9.")
-        
+        n = math.isqrt(len(flat))
+        if n < 2 or n * n != len(flat):
+            raise ValueError("Key needs a square number of items (4, 9, 16, ...).")
+        rows = [flat[i:i + n] for i in range(0, len(flat), n)]
+
     n = len(rows)
-    if n not in (2, 3):
-        raise ValueError("Only 2x2 and 3x3 matrices are allowed.")
+    if n < 2:
+        raise ValueError("Key matrix must be at least 2x2.")
     for r in rows:
         if len(r) != n:
             raise ValueError("Matrix must be square.")
@@ -141,20 +158,26 @@ def mat_inv3(M):
           ]
     return [[(invd * adj[r][c]) % MOD for c in range(3)] for r in range(3)]
 
+def mat_inv(M):
+    """Inverse of an n x n matrix mod 26 by Gauss-Jordan elimination."""
+    A = np.asarray(M, dtype=np.int64) % MOD
+    if A.ndim != 2 or A.shape[0] != A.shape[1]:
+        raise ValueError("Matrix must be square.")
+    try:
+        inv = _solve_mod(A, np.eye(len(A), dtype=np.int64))
+    except ValueError:
+        raise ValueError("Key matrix is not invertible mod 26.") from None
+    return inv.tolist()
+
 def mat_mul_vec(M, v):
     n = len(M)
     return [sum(M[r][k] * v[k] for k in range(n)) % MOD for r in range(n)]
 
 def _block_process(letters: str, M):
     n = len(M)
-    out = []
-    for i in range(0, len(letters), n):
-        block = letters[i:i+n]
-        vec = [idx(c) for c in block]
-        res = mat_mul_vec(M, vec)
-        out.extend(ch(x) for x in res)
-    
-    return "".join(out)
+    blocks = (np.frombuffer(letters.encode("ascii"), dtype=np.uint8) - 65).astype(np.int64).reshape(-1, n)
+    out = (blocks @ np.asarray(M, dtype=np.int64).T) % MOD + 65
+    return out.astype(np.uint8).tobytes().decode("ascii")
 
 def _with_space_reinsert(original: str, processed: str) -> str:
     res = list(original.upper())
@@ -183,7 +206,7 @@ def encrypt(text: str, key_matrix_str: str, pad_char: str = "X", keep_layout: bo
 
 def decrypt(text: str, key_matrix_str: str, keep_layout: bool = False) -> str:
     M, n = parse_matrix(key_matrix_str)
-    Minv = mat_inv2(M) if n == 2 else mat_inv3(M)
+    Minv = mat_inv(M)
 
     letters = letters_only_and_positions(text)[0] if keep_layout else clean_letters(text)
 
@@ -193,23 +216,130 @@ def decrypt(text: str, key_matrix_str: str, keep_layout: bool = False) -> str:
     out_letters = _block_process(letters, Minv)
     return _with_space_reinsert(text, out_letters) if keep_layout else out_letters
 
+def _solve_mod(A, B):
+    """X with A @ X == B (mod 26), A is (r, n) with r >= n, raises ValueError if X is not unique."""
+    aug = np.concatenate([np.asarray(A), np.asarray(B)], axis=1).astype(np.int64) % MOD
+    rows, n = aug.shape[0], np.asarray(A).shape[1]
+    for col in range(n):
+        # Euclid on the column: leaves the gcd of its entries in one row
+        while True:
+            nz = [i for i in range(col, rows) if aug[i, col]]
+            if len(nz) <= 1:
+                break
+            piv = min(nz, key=lambda i: aug[i, col])
+            for i in nz:
+                if i != piv:
+                    aug[i] = (aug[i] - (aug[i, col] // aug[piv, col]) * aug[piv]) % MOD
+        if not nz or egcd(int(aug[nz[0], col]), MOD)[0] != 1:
+            raise ValueError("Known plaintext does not determine the key (matrix not invertible mod 26).")
+        aug[[col, nz[0]]] = aug[[nz[0], col]]
+        aug[col] = (aug[col] * modinv(int(aug[col, col]))) % MOD
+        for i in range(rows):
+            if i != col and aug[i, col]:
+                aug[i] = (aug[i] - aug[i, col] * aug[col]) % MOD
+    return aug[:n, n:]
+
+def _key_str(M) -> str:
+    return ",".join(str(int(x)) for x in np.asarray(M).ravel())
+
+def _blocks(letters: str, n: int) -> np.ndarray:
+    """(n, blocks) matrix of letter indices, a trailing partial block is dropped."""
+    idx = scoring.letter_indices(letters)
+    usable = len(idx) - len(idx) % n
+    return idx[:usable].reshape(-1, n).T.astype(np.int64)
+
+def solve_known(plaintext: str, ciphertext: str, n: int = 2):
+    """Encryption matrix from aligned plaintext/ciphertext, needs n blocks that determine it."""
+    p, c = clean_letters(plaintext), clean_letters(ciphertext)
+    size = min(len(p), len(c))
+    P, C = _blocks(p[:size], n), _blocks(c[:size], n)
+    if P.shape[1] < n:
+        raise ValueError(f"Need at least {n * n} letters of known plaintext.")
+    # C = M @ P, so P.T @ M.T = C.T
+    M = _solve_mod(P.T, C.T).T
+    # the blocks beyond the first n only check the key
+    if ((M @ P) % MOD != C).any():
+        raise ValueError("Known plaintext does not match any Hill key.")
+    return M
+
+@lru_cache(maxsize=None)
+def _invertible_2x2() -> np.ndarray:
+    grid = np.indices((MOD,) * 4).reshape(4, -1).T
+    det = (grid[:, 0] * grid[:, 3] - grid[:, 1] * grid[:, 2]) % MOD
+    return grid[np.gcd(det, MOD) == 1].reshape(-1, 2, 2).astype(np.int64)
+
+def _rank_decryptions(D: np.ndarray, C: np.ndarray, batch: int = 8192) -> np.ndarray:
+    """Quadgram score of D[k] @ C for every candidate decryption matrix."""
+    scores = np.empty(len(D))
+    for i in range(0, len(D), batch):
+        plain = (D[i:i + batch] @ C) % MOD
+        rows = plain.transpose(0, 2, 1).reshape(len(plain), -1)
+        scores[i:i + batch] = scoring.quadgram_scores(rows)
+    return scores
+
+def _row_candidates(C: np.ndarray, top: int) -> np.ndarray:
+    """The `top` decryption rows whose plaintext letters look most like English."""
+    n = C.shape[0]
+    rows = np.indices((MOD,) * n).reshape(n, -1).T.astype(np.int64)
+    # a row sharing a factor with 26 can not be part of an invertible key
+    rows = rows[np.gcd(np.gcd.reduce(rows, axis=1), MOD) == 1]
+    letters = (rows @ C) % MOD
+    fit = scoring.row_letter_counts(letters) @ scoring.ENGLISH_LOG_FREQ
+    return rows[np.argsort(-fit, kind="stable")[:top]]
+
+def crack(ciphertext: str, n: int = 2, known_plaintext: str | None = None, limit: int | None = 5,
+          top: int = 10, sample: int = 240):
+    """
+    Rank Hill keys for ciphertext, returns [(key, plaintext, score)] best first.
+
+    key is the encryption matrix as "a,b,c,d", usable with decrypt().
+    """
+    letters = clean_letters(ciphertext)
+    if known_plaintext:
+        key = _key_str(solve_known(known_plaintext, letters, n))
+        pt = decrypt(letters, key)
+        return [(key, pt, scoring.quadgram_score(pt))]
+    if len(letters) < 2 * n:
+        raise ValueError("Ciphertext is too short to crack.")
+    if n > 4:
+        raise ValueError("crack without known plaintext supports keys up to 4x4.")
+
+    C = _blocks(letters[:sample - sample % n], n)
+    if n == 2:
+        D = _invertible_2x2()
+    else:
+        cand = _row_candidates(C, top)
+        D = np.array([cand[list(rows)] for rows in permutations(range(len(cand)), n)])
+        D = D[np.gcd(np.rint(np.linalg.det(D)).astype(np.int64) % MOD, MOD) == 1]
+    scores = _rank_decryptions(D, C)
+
+    results = []
+    for k in np.argsort(-scores, kind="stable")[:limit]:
+        key = _key_str(mat_inv(D[k]))
+        pt = decrypt(letters, key)
+        results.append((key, pt, scoring.quadgram_score(pt)))
+    return sorted(results, key=lambda r: -r[2])
+
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="pydecodr.ciphers.classical.hill",
-        description="Hill cipher (2x2) or 3x3 matrix encryption/decryption",
+        description="Hill cipher (n x n matrix) encryption/decryption",
         epilog=(
              "Matrix formats accepted:\n"
             '   2x2: "a,b,c,d" | "a b c d" | "a,b; c,d;" | "a b | c d"\n'
-            'same with 3x3 but with 9 items yk\n'
+            'same with 3x3 (9 items) and larger square keys\n'
             "Examples:\n"
             '   python3 -m pydecodr.ciphers.classical.hill encrypt "ATTACKATDAWN" "3,3,2,5"\n'
         ),
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
-    p.add_argument("action", choices=["encrypt", "decrypt"], help='action to perform')
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help='action to perform')
     p.add_argument("text", help="plaintext or ciphertext")
-    p.add_argument("matrix", help="matrix key, e.g. '3,3,2,4'")
+    p.add_argument("matrix", nargs="?", default=None, help="matrix key, e.g. '3,3,2,4' (not needed for crack)")
+    p.add_argument("--size", type=int, default=2, help="key size n for crack (default: 2)")
+    p.add_argument("--known", help="known plaintext prefix for crack")
+    p.add_argument("--top", type=int, default=5, help="number of crack results to show (default: 5)")
     p.add_argument("--pad-char", default="X", help="padding character for encryption (default: X)")
     p.add_argument("--keep-layout", action="store_true", help="keep original text layout (spaces/newlines preserverd)")
 
@@ -232,6 +362,10 @@ if __name__ == "__main__":
         elif action == "decrypt":
             print(decrypt(text, key_str, keep_layout=keep_layout))
             sys.exit(0)
+        elif action == "crack":
+            for key, pt, score in crack(text, n=args.size, known_plaintext=args.known, limit=args.top):
+                print(f"[{key}] ({score:.2f}) -> {pt}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
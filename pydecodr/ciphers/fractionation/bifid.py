@@ -1,11 +1,30 @@
 """
 pydecodr.ciphers.fractionation.bifid - bifid cipher (polybius + fractionation)
+
+Within a block of `period` letters (period=0: the whole message) the
+rows are written out, then the columns, and the stream is read back in
+coordinate pairs. That is a fixed permutation of the interleaved
+row/column stream, built once by _order() and applied to integer arrays.
+
+crack estimates the period from the ciphertext alone: ciphertext letters
+k and k + ceil(L/2) of a block of length L together carry the rows and
+columns of the same plaintext digram, so their pairs keep the index of
+coincidence of English digrams only at the right period. For odd L a pair
+only holds one whole letter, the signal is weaker and the right period is
+often ranked second or third on short texts, so the best few candidates
+take turns. The square is recovered by annealing, decrypting batches of
+candidate squares through the same permutation.
 """
 
 from __future__ import annotations
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import sys
 import argparse
+import random
+from functools import partial
+from itertools import permutations
+import numpy as np
+from pydecodr.utils import scoring, runner, squares
 
 ALPHABET_25 = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
 
@@ -36,7 +55,7 @@ def _reinsert_nonletters(proc_letters: List[str], mask: List[Tuple[int, str]]) -
     
     return "".join(out)
 
-def _build_square(key: str | None) -> List[List[str]]:
+def _build_square(key: str | None) -> str:
     seen = set()
     seq = []
     if key:
@@ -46,112 +65,196 @@ def _build_square(key: str | None) -> List[List[str]]:
                 if ch not in seen and ch in ALPHABET_25:
                     seen.add(ch)
                     seq.append(ch)
-    
+
     for ch in ALPHABET_25:
         if ch not in seen:
             seq.append(ch)
-    
-    return [seq[i: i + 5] for i in range(0, 25, 5)]
-
-def _coord_map(square: List[List[str]]):
-    pos = {}
-    for r in range(5):
-        for c in range(5):
-            pos[square[r][c]] = (r + 1, c + 1)
-    return pos
-
-def _letter_from_coords(square: List[List[str]], r: int, c: int) -> str:
-    return square[r - 1][c - 1]
-
-def _fractionate(rows: List[int], cols: List[int], period: int) -> Tuple[List[int], List[int]]:
-    out_rows: List[int] = []
-    out_cols: List[int] = []
-    n = len(rows)
-    i = 0
-    while i < n:
-        block_r = rows[i: i + period]
-        block_c = cols[i: i + period]
-        combined = block_r + block_c
-
-        out_rows.extend(combined[: len(block_r)])
-        out_cols.extend(combined[len(block_r) :])
-        i += period
-
-    return out_rows, out_cols
+
+    return "".join(seq)
+
+def _order(n: int, period: int) -> np.ndarray:
+    """
+    Permutation taking the interleaved (row, col) stream of n plaintext
+    letters to the fractionated stream: stream = coords[_order(n, period)].
+    """
+    p = n if period == 0 else period
+    idx = np.arange(n)
+    start = idx - idx % p
+    length = np.minimum(p, n - start)
+    i = idx - start
+    order = np.empty(2 * n, dtype=np.intp)
+    order[2 * start + i] = 2 * idx
+    order[2 * start + length + i] = 2 * idx + 1
+    return order
+
+def _check_period(period: int) -> None:
+    if period < 0:
+        raise ValueError("period must be >= 1, or 0 for the whole message")
+
+def _cells(letters: List[str], square: str) -> np.ndarray:
+    pos = {ch: i for i, ch in enumerate(square)}
+    return np.array([pos[ch] for ch in letters], dtype=np.intp)
+
+def _letters(cells: np.ndarray, square: str) -> List[str]:
+    return [square[c] for c in cells.tolist()]
 
 def encrypt(plaintext: str, key: str | None = None, period: int = 5) -> str:
-    if period <= 0:
-        raise ValueError("period must be >=1")
-    
+    _check_period(period)
+
     letters, mask = _normalize_text(plaintext)
     if not letters:
         return plaintext
 
     square = _build_square(key)
-    pos = _coord_map(square)
-
-    rows: List[int] = []
-    cols: List[int] = []
-    for ch in letters:
-        r, c = pos[ch]
-        rows.append(r)
-        cols.append(c)
-
-    out_letters: List[str] = []
-    n = len(letters)
-    i = 0
-    while i < n:
-        blk_len = min(period, n - i)
-        r_block = rows[i: i + blk_len]
-        c_block = cols[i: i + blk_len]
-        combined = r_block + c_block
-        for j in range(0, 2 * blk_len, 2):
-            rr = combined[j]
-            cc = combined[j + 1]
-            out_letters.append(_letter_from_coords(square, rr, cc))
-        i += blk_len
-
-    return _reinsert_nonletters(out_letters, mask)
+    cells = _cells(letters, square)
+    coords = np.empty(2 * cells.size, dtype=np.intp)
+    coords[0::2], coords[1::2] = np.divmod(cells, 5)
+    stream = coords[_order(cells.size, period)]
+    return _reinsert_nonletters(_letters(stream[0::2] * 5 + stream[1::2], square), mask)
 
 def decrypt(ciphertext: str, key: str | None = None, period: int = 5) -> str:
-    if period <= 0:
-        raise ValueError("period must be >=1")
-    
+    _check_period(period)
+
     letters, mask = _normalize_text(ciphertext)
     if not letters:
         return ciphertext
 
     square = _build_square(key)
-    pos = _coord_map(square)
-
-    rows: List[int] = []
-    cols: List[int] = []
-    for ch in letters:
-        r, c = pos[ch]
-        rows.append(r)
-        cols.append(c)
-
-    seq: List[int] = []
-    for ch in letters:
-        r, c = pos[ch]
-        seq.extend([r, c])
-
-    out_letters: List[str] = []
-    n = len(letters)
-    i = 0
-    p = 0
-    while i < n:
-        blk_len = min(period, n - i)
-        block = seq[p : p + 2 * blk_len]
-        r_block = block[:blk_len]
-        c_block = block[blk_len:]
-        for j in range(blk_len):
-            out_letters.append(_letter_from_coords(square, r_block[j], c_block[j]))
-        
-        p += 2 * blk_len
-        i += blk_len
-
-    return _reinsert_nonletters(out_letters, mask)
+    cells = _cells(letters, square)
+    stream = np.empty(2 * cells.size, dtype=np.intp)
+    stream[0::2], stream[1::2] = np.divmod(cells, 5)
+    coords = np.empty_like(stream)
+    coords[_order(cells.size, period)] = stream
+    return _reinsert_nonletters(_letters(coords[0::2] * 5 + coords[1::2], square), mask)
+
+# 25-letter index <-> A..Z index
+_TO_26 = np.array([ord(ch) - 65 for ch in ALPHABET_25], dtype=np.intp)
+_FROM_26 = np.full(26, 255, dtype=np.uint8)
+_FROM_26[_TO_26] = np.arange(25, dtype=np.uint8)
+_FROM_26[ord("J") - 65] = _FROM_26[ord("I") - 65]
+
+_CELLS = squares.CELLS
+
+def _letters_25(text: str) -> np.ndarray:
+    return _FROM_26[scoring.letter_indices(text)].astype(np.intp)
+
+def _periods(n: int, max_period: int) -> List[int]:
+    # any period >= n is one block, the same as 0
+    return list(range(2, min(max_period, n - 1) + 1)) + [0]
+
+def _pair_ioc(cipher: np.ndarray, period: int) -> float:
+    n = cipher.size
+    p = n if period == 0 else period
+    idx = np.arange(n)
+    start = idx - idx % p
+    length = np.minimum(p, n - start)
+    # odd blocks carry one plaintext letter per pair at both ceil(L/2)
+    # and floor(L/2), each offset is counted on its own and pooled
+    same, total = 0.0, 0.0
+    for offset in ((length + 1) // 2, np.where(length % 2 == 1, length // 2, 0)):
+        partner = idx + offset
+        ok = (partner > idx) & (partner < start + length)
+        pairs = cipher[idx[ok]] * 25 + cipher[partner[ok]]
+        counts = np.bincount(pairs, minlength=625).astype(np.float64)
+        same += (counts * (counts - 1)).sum()
+        total += pairs.size * (pairs.size - 1)
+    return float(same / total * 625) if total else 0.0
+
+def estimate_period(ciphertext: str, max_period: int = 20) -> List[Tuple[int, float]]:
+    """
+    Candidate periods ranked by the digram IoC of (C[k], C[k + ceil(L/2)])
+    pairs (and C[k + floor(L/2)] for odd L), 0 = whole message.
+    """
+    cipher = _letters_25(ciphertext)
+    if cipher.size < 4:
+        raise ValueError("Ciphertext needs at least 4 letters")
+    ranked = [(p, _pair_ioc(cipher, p)) for p in _periods(cipher.size, max_period)]
+    return sorted(ranked, key=lambda r: -r[1])
+
+def _coord_index(cipher: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Where the row and column of every plaintext letter come from, as
+    indexes into [row of letter 0..24, col of letter 0..24] of a square.
+    """
+    n = cipher.size
+    src = np.empty(2 * n, dtype=np.intp)
+    src[_order(n, period)] = np.arange(2 * n)
+    # src[j]: stream position holding plaintext coordinate j, which is the
+    # row (even) or column (odd) of ciphertext letter src[j] // 2
+    table = (src % 2) * 25 + cipher[src // 2]
+    return table[0::2], table[1::2]
+
+_MOVES, _MOVE_CDF = squares.move_table()
+
+# relabelling rows and columns with the same permutation gives an
+# equivalent square, every key has 120 spellings
+_RELABEL = np.array([[s[r] * 5 + s[c] for r in range(5) for c in range(5)] for s in permutations(range(5))],
+                    dtype=np.intp)
+
+def _scores(keys: np.ndarray, rows_from: np.ndarray, cols_from: np.ndarray) -> np.ndarray:
+    """Quadgram score of the plaintext under every row of keys (cell -> letter)."""
+    index = np.arange(keys.shape[0])[:, None]
+    pos = np.empty_like(keys)
+    pos[index, keys] = _CELLS
+    coords = np.concatenate(np.divmod(pos, 5), axis=1)
+    cells = coords[:, rows_from] * 5 + coords[:, cols_from]
+    return scoring.quadgram_scores(_TO_26[keys].ravel()[cells + index * 25])
+
+def _anneal(seed: int, cipher: np.ndarray, period: int, iterations: int, temperature: float,
+            target: float) -> Tuple[float, Tuple[int, np.ndarray]]:
+    rows_from, cols_from = _coord_index(cipher, period)
+    score, key = squares.anneal(np.random.default_rng(seed), partial(_scores, rows_from=rows_from, cols_from=cols_from),
+                                _MOVES, _MOVE_CDF, iterations, temperature, target)
+    return score, (period, key)
+
+def _canonical(result: Tuple[int, np.ndarray]) -> Tuple[int, bytes]:
+    period, key = result
+    return period, min(row.tobytes() for row in key[_RELABEL])
+
+def _anneal_periods(seed: int, first: int, cipher: np.ndarray, periods: Tuple[int, ...], iterations: int,
+                    temperature: float, target: float) -> Tuple[float, Tuple[int, np.ndarray]]:
+    """Restart seed - first goes to the candidate periods in turn."""
+    return _anneal(seed, cipher, periods[(seed - first) % len(periods)], iterations, temperature, target)
+
+def crack(ciphertext: str, period: Optional[int] = None, max_period: int = 20, periods: int = 4,
+          restarts: int = 20, iterations: int = 400000, timeout: Optional[float] = None,
+          temperature: Optional[float] = None, limit: int = 5, seed: Optional[int] = None,
+          workers: Optional[int] = 1, target: Optional[float] = None) -> List[Tuple[str, int, str, float]]:
+    """
+    Recover the square (and the period unless given), returns [(key, period, plaintext, score)].
+
+    Without a period the best `periods` estimates take turns, `restarts`
+    each, so a true period ranked below a wrong one (odd periods on short
+    texts) is still reached early. timeout covers the whole search.
+    """
+    cipher = _letters_25(ciphertext)
+    if cipher.size < 8:
+        raise ValueError("Ciphertext needs at least 8 letters")
+    if temperature is None:
+        temperature = 0.04 * cipher.size
+    if target is None:
+        target = squares.default_target(cipher.size)
+    first = random.randrange(1 << 30) if seed is None else seed
+
+    if period is None:
+        ranked = estimate_period(ciphertext, max_period)
+        candidates = tuple(p for p, _ in ranked[:max(1, periods)])
+        task, args = _anneal_periods, (first, cipher, candidates, iterations, temperature, target)
+    else:
+        _check_period(period)
+        candidates = (period,)
+        task, args = _anneal, (cipher, period, iterations, temperature, target)
+
+    found = runner.run_restarts(
+        task, restarts * len(candidates), args,
+        workers=workers, limit=limit, target=target, timeout=timeout, seed=first, key=_canonical,
+    )
+
+    results = []
+    for score, (p, key) in found:
+        k = "".join(ALPHABET_25[i] for i in key)
+        results.append((k, p, decrypt(ciphertext, k, p), score))
+    return results
 
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -159,10 +262,15 @@ def _build_argparser() -> argparse.ArgumentParser:
         description="Bifid cipher"
     )
 
-    p.add_argument("action", choices=["encrypt", "decrypt"], help="action to perform")
+    p.add_argument("action", choices=["encrypt", "decrypt", "period", "crack"], help="action to perform")
     p.add_argument("text", help="plaintext or cipher text (quote if contains spaces)")
     p.add_argument('--key', default=None, help="optional Polybius key (default: None)")
-    p.add_argument("--period", type=int, default=5, help="period for fractionation (default: 5)")
+    p.add_argument("--period", type=int, default=None,
+                   help="period for fractionation, 0 = whole message (default: 5, estimated for crack)")
+    p.add_argument("--max-period", type=int, default=20, help="largest period tried by period/crack (default: 20)")
+    p.add_argument("--restarts", type=int, default=20, help="number of annealing restarts for crack (default: 20)")
+    p.add_argument("--timeout", type=float, default=None, help="wall-clock limit in seconds for crack")
+    p.add_argument("--workers", type=int, default=1, help="worker processes, 0 uses every core (default: 1)")
 
     return p
 
@@ -173,7 +281,7 @@ if __name__ == "__main__":
     action = args.action
     text = args.text
     key = args.key
-    period = args.period 
+    period = 5 if args.period is None else args.period
 
     try:
         if action == "encrypt":
@@ -182,6 +290,16 @@ if __name__ == "__main__":
         elif action == "decrypt":
             print(decrypt(text, key=key, period=period))
             sys.exit(0)
+        elif action == "period":
+            for p, ioc in estimate_period(text, max_period=args.max_period)[:5]:
+                print(f"{p}: {ioc:.3f}")
+            sys.exit(0)
+        elif action == "crack":
+            for k, p, pt, score in crack(text, period=args.period, max_period=args.max_period,
+                                         restarts=args.restarts, timeout=args.timeout,
+                                         workers=args.workers or None):
+                print(f"{k} period={p} ({score:.2f}): {pt}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
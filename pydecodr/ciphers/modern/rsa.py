@@ -1,10 +1,25 @@
 """
 pydecodr.ciphers.modern.rsa - rsa cipher
+
+encrypt/decrypt keep the old one-modexp-per-character text format. The
+bytes API packs as many bytes per modexp as the modulus allows: the
+message is cut into blocks of at most max_block_size(n, padding) bytes,
+every block becomes one integer (raw, PKCS#1 v1.5 or OAEP framing) and
+the ciphertext is the concatenation of k-byte blocks, k = byte length of n.
+Decryption uses the CRT when p and q are given, decrypt_many() shares
+that setup across many ciphertexts.
+
+Raw blocks are textbook RSA. The last raw block starts with a 0x01
+marker byte so leading zero bytes survive the round trip, a message
+that fills its last block exactly gets an extra block holding only the
+marker.
 """
 
 from __future__ import annotations
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple, Union
+import hashlib
 import math
+import os
 import sys
 import argparse
 
@@ -26,18 +41,29 @@ def _modinv(a: int, m: int) -> int:
 
     return s0 % m
 
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71)
+
 def is_prime(n: int) -> bool:
-    if n <= 1:
+    """Miller-Rabin with the first 20 primes as bases, exact below 3.3e24."""
+    if n < 2:
         return False
-    if n <= 3:
-        return True
-    if n % 2 == 0 or n % 3 == 0:
-        return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0:
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _SMALL_PRIMES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
             return False
-        i += 6
 
     return True
 
@@ -61,6 +87,140 @@ def decrypt(ciphertext: str, n: int, d: int) -> str:
     parts = ciphertext.strip().split()
     return "".join(chr(pow(int(x), d, n)) for x in parts)
 
+PADDINGS = ("raw", "pkcs1", "oaep")
+OAEP_HASH = hashlib.sha1
+
+def _byte_len(n: int) -> int:
+    return (n.bit_length() + 7) // 8
+
+def max_block_size(n: int, padding: str = "raw") -> int:
+    k = _byte_len(n)
+    if padding == "raw":
+        size = k - 1
+    elif padding == "pkcs1":
+        size = k - 11
+    elif padding == "oaep":
+        size = k - 2 * OAEP_HASH().digest_size - 2
+    else:
+        raise ValueError(f"Unknown padding: {padding} (expected one of {', '.join(PADDINGS)})")
+    if size < 1:
+        raise ValueError(f"modulus is too small for {padding} padding")
+    return size
+
+def _mgf1(seed: bytes, length: int) -> bytes:
+    out = bytearray()
+    counter = 0
+    while len(out) < length:
+        out += OAEP_HASH(seed + counter.to_bytes(4, "big")).digest()
+        counter += 1
+    return bytes(out[:length])
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
+def _pad_block(block: bytes, k: int, padding: str, last: bool) -> int:
+    if padding == "raw":
+        return int.from_bytes(b"\x01" + block if last else block, "big")
+    if padding == "pkcs1":
+        ps = bytearray()
+        while len(ps) < k - 3 - len(block):
+            ps += bytes(b for b in os.urandom(k) if b)
+        em = b"\x00\x02" + bytes(ps[:k - 3 - len(block)]) + b"\x00" + block
+        return int.from_bytes(em, "big")
+    h_len = OAEP_HASH().digest_size
+    db = OAEP_HASH(b"").digest() + bytes(k - len(block) - 2 * h_len - 2) + b"\x01" + block
+    seed = os.urandom(h_len)
+    masked_db = _xor(db, _mgf1(seed, len(db)))
+    masked_seed = _xor(seed, _mgf1(masked_db, h_len))
+    return int.from_bytes(b"\x00" + masked_seed + masked_db, "big")
+
+def _unpad_block(m: int, k: int, padding: str, last: bool) -> bytes:
+    if padding == "raw":
+        block = m.to_bytes(k - 1, "big")
+        if not last:
+            return block
+        framed = block.lstrip(b"\x00")
+        if framed[:1] != b"\x01":
+            raise ValueError("invalid raw block framing")
+        return framed[1:]
+    em = m.to_bytes(k, "big")
+    if padding == "pkcs1":
+        sep = em.find(b"\x00", 2)
+        if em[:2] != b"\x00\x02" or sep < 10:
+            raise ValueError("invalid PKCS#1 v1.5 padding")
+        return em[sep + 1:]
+    h_len = OAEP_HASH().digest_size
+    masked_seed, masked_db = em[1:1 + h_len], em[1 + h_len:]
+    seed = _xor(masked_seed, _mgf1(masked_db, h_len))
+    db = _xor(masked_db, _mgf1(seed, len(masked_db)))
+    sep = db.find(b"\x01", h_len)
+    if em[0] != 0 or db[:h_len] != OAEP_HASH(b"").digest() or sep < 0 or db[h_len:sep].strip(b"\x00"):
+        raise ValueError("invalid OAEP padding")
+    return db[sep + 1:]
+
+def _crt_params(n: int, d: int, p: int, q: int) -> Tuple[int, int, int, int, int]:
+    if p * q != n:
+        raise ValueError("p * q does not equal n")
+    return p, q, d % (p - 1), d % (q - 1), pow(q, -1, p)
+
+def _decrypt_int(c: int, n: int, d: int, crt: Optional[Tuple[int, int, int, int, int]]) -> int:
+    if crt is None:
+        return pow(c, d, n)
+    p, q, dp, dq, qinv = crt
+    m1 = pow(c, dp, p)
+    m2 = pow(c, dq, q)
+    return m2 + (qinv * (m1 - m2) % p) * q
+
+def encrypt_bytes(data: bytes, n: int, e: int, *, padding: str = "raw") -> bytes:
+    size = max_block_size(n, padding)
+    k = _byte_len(n)
+    blocks = [data[i:i + size] for i in range(0, max(len(data), 1), size)]
+    if padding == "raw" and len(blocks[-1]) == size:
+        # no room for the marker byte
+        blocks.append(b"")
+    out = bytearray()
+    for i, block in enumerate(blocks):
+        out += pow(_pad_block(block, k, padding, i == len(blocks) - 1), e, n).to_bytes(k, "big")
+    return bytes(out)
+
+def decrypt_bytes(ciphertext: bytes, n: int, d: int, *, p: Optional[int] = None, q: Optional[int] = None,
+                  padding: str = "raw") -> bytes:
+    return decrypt_many([ciphertext], n, d, p=p, q=q, padding=padding)[0]
+
+def decrypt_many(ciphertexts: Iterable[Union[bytes, int]], n: int, d: int, *, p: Optional[int] = None,
+                 q: Optional[int] = None, padding: str = "raw") -> List[bytes]:
+    """Decrypt many block ciphertexts (bytes, or ints for single blocks) with one key setup."""
+    max_block_size(n, padding)
+    k = _byte_len(n)
+    crt = _crt_params(n, d, p, q) if p is not None and q is not None else None
+    results = []
+    for ct in ciphertexts:
+        if isinstance(ct, int):
+            ct = ct.to_bytes(k, "big")
+        if not ct or len(ct) % k:
+            raise ValueError(f"ciphertext length must be a multiple of {k} bytes")
+        count = len(ct) // k
+        parts = []
+        for i in range(count):
+            c = int.from_bytes(ct[i * k:(i + 1) * k], "big")
+            if c >= n:
+                raise ValueError("ciphertext block is not smaller than n")
+            parts.append(_unpad_block(_decrypt_int(c, n, d, crt), k, padding, i == count - 1))
+        results.append(b"".join(parts))
+    return results
+
+def attack(targets, timeout: Optional[float] = 30.0):
+    """Run the weak-key attacks of rsa_attacks on (n, e, c) or (n, e) targets, see rsa_attacks.attack."""
+    from pydecodr.ciphers.modern import rsa_attacks
+    if targets and isinstance(targets[0], int):
+        targets = [targets]
+    return rsa_attacks.attack(targets, timeout=timeout)
+
+def batch_gcd(moduli, *, spill_dir=None):
+    """Moduli sharing a prime factor via product/remainder trees, see rsa_attacks.batch_gcd."""
+    from pydecodr.ciphers.modern import rsa_attacks
+    return rsa_attacks.batch_gcd(moduli, spill_dir=spill_dir)
+
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="pydecodr.ciphers.modern.rsa",
@@ -77,11 +237,23 @@ def _build_argparser() -> argparse.ArgumentParser:
     sp_enc.add_argument("text", help="plaintext (quote if contains spaces)")
     sp_enc.add_argument("n", type=int, help="modulus n")
     sp_enc.add_argument("e", type=int, help="public exponent e")
+    sp_enc.add_argument("--padding", choices=PADDINGS, help="block mode with this padding, hex output (default: per character)")
 
     sp_dec = sub.add_parser("decrypt", help="decrypt cipher with (n, d)")
     sp_dec.add_argument("cipher", help="ciphertext (hex or int string)")
     sp_dec.add_argument("n", type=int, help="modululs n")
     sp_dec.add_argument("d", type=int, help="private exponent d")
+    sp_dec.add_argument("--padding", choices=PADDINGS, help="block mode with this padding, hex input (default: per character)")
+    sp_dec.add_argument("--p", type=int, help="prime p, enables CRT decryption")
+    sp_dec.add_argument("--q", type=int, help="prime q, enables CRT decryption")
+
+    sp_att = sub.add_parser("attack", help="try weak-key attacks on one or more n:e[:c] targets")
+    sp_att.add_argument("targets", nargs="+", help="targets as n:e or n:e:c (decimal)")
+    sp_att.add_argument("--timeout", type=float, default=30.0, help="time budget in seconds (default: 30)")
+
+    sp_bg = sub.add_parser("batch-gcd", help="find moduli sharing a prime factor")
+    sp_bg.add_argument("file", help="file with one modulus per line (decimal or hex)")
+    sp_bg.add_argument("--spill", help="directory to spill the product tree to")
 
     return p
 
@@ -96,13 +268,44 @@ if __name__ == "__main__":
             print(f"Private key (n, d): {priv}")
             sys.exit(0)
         if args.command == "encrypt":
-            print(encrypt(args.text, args.n, args.e))
+            if args.padding:
+                print(encrypt_bytes(args.text.encode("utf-8"), args.n, args.e, padding=args.padding).hex())
+            else:
+                print(encrypt(args.text, args.n, args.e))
             sys.exit(0)
         
         if args.command == "decrypt":
-            print(decrypt(args.cipher, args.n, args.d))
+            if args.padding:
+                pt = decrypt_bytes(bytes.fromhex(args.cipher), args.n, args.d, p=args.p, q=args.q, padding=args.padding)
+                print(pt.decode("utf-8", errors="replace"))
+            else:
+                print(decrypt(args.cipher, args.n, args.d))
             sys.exit(0)
         
+        if args.command == "attack":
+            targets = []
+            for t in args.targets:
+                parts = [int(x) for x in t.split(":")]
+                targets.append((parts[0], parts[1], parts[2] if len(parts) > 2 else None))
+            results = attack(targets, timeout=args.timeout)
+            if not results:
+                print("no attack succeeded")
+            for r in results:
+                line = f"[{r.attack}, {r.seconds:.3f}s] targets {list(r.targets)}"
+                if r.p:
+                    line += f" p={r.p} q={r.q}"
+                if r.m is not None:
+                    line += f" m={r.m}"
+                print(line)
+            sys.exit(0)
+
+        if args.command == "batch-gcd":
+            found = batch_gcd(args.file, spill_dir=args.spill)
+            for i, n, g in found:
+                print(f"line {i + 1}: n={n} shares {g}" + (f" q={n // g}" if g != n else " (all factors shared)"))
+            print(f"{len(found)} moduli with a shared factor", file=sys.stderr)
+            sys.exit(0)
+
         parser.print_help()
         sys.exit(1)
     except Exception as e:
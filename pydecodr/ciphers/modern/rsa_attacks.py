@@ -0,0 +1,440 @@
+"""
+pydecodr.ciphers.modern.rsa_attacks - attacks on weak RSA keys
+
+attack() takes (n, e, c) targets (c may be None when only the factors are
+wanted) and runs the cheap attacks first under one time budget:
+
+    multi-target: common modulus, shared prime factor, Hastad broadcast
+    per target:   small-e root, trial division, Wiener, Fermat,
+                  Pollard p-1, Pollard rho (Brent)
+
+Every success is reported as a Result naming the attack and its time.
+Integer roots use math.isqrt and Newton iteration.
+
+batch_gcd() finds shared factors across many moduli with a product tree
+and a remainder tree (Bernstein), O(n log^2 n) instead of pairwise gcds.
+The tree levels can be spilled to disk. The big multiplications and
+divisions need gmpy2 (pip install pydecodr[fast]): with plain ints the
+trees are slower than the pairwise loop, so large inputs warn without it.
+"""
+
+from __future__ import annotations
+import math
+import os
+import pickle
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+Target = Tuple[int, int, Optional[int]]
+
+class Result(NamedTuple):
+    attack: str
+    seconds: float
+    targets: Tuple[int, ...]
+    p: Optional[int]
+    q: Optional[int]
+    d: Optional[int]
+    m: Optional[int]
+
+class _Budget:
+    __slots__ = ("deadline",)
+
+    def __init__(self, seconds: Optional[float]):
+        self.deadline = None if seconds is None else time.time() + seconds
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() > self.deadline
+
+    def within(self, seconds: float) -> "_Budget":
+        """A budget ending after seconds, or at this one's deadline if that comes first."""
+        sub = _Budget(seconds)
+        if self.deadline is not None:
+            sub.deadline = min(sub.deadline, self.deadline)
+        return sub
+
+def iroot(x: int, k: int) -> Tuple[int, bool]:
+    """Integer k-th root of x >= 0, returns (floor root, exact)."""
+    if x < 0:
+        raise ValueError("iroot of a negative number")
+    if k == 2:
+        r = math.isqrt(x)
+        return r, r * r == x
+    if x < 2:
+        return x, True
+    # Newton iteration from an upper bound based on the bit length
+    r = 1 << -(-x.bit_length() // k)
+    while True:
+        nxt = ((k - 1) * r + x // r ** (k - 1)) // k
+        if nxt >= r:
+            break
+        r = nxt
+    return r, r ** k == x
+
+def _egcd(a: int, b: int) -> Tuple[int, int, int]:
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b:
+        q, a, b = a // b, b, a % b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+def _small_primes(limit: int) -> List[int]:
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+    return [i for i, ok in enumerate(sieve) if ok]
+
+def trial_division(n: int, budget: _Budget, limit: int = 100_000) -> Optional[int]:
+    for p in _small_primes(limit):
+        if n % p == 0 and p != n:
+            return p
+    return None
+
+def fermat(n: int, budget: _Budget, max_steps: int = 2_000_000) -> Optional[int]:
+    """Factor n = p*q when p and q are close to sqrt(n)."""
+    a = math.isqrt(n)
+    if a * a == n:
+        return a
+    a += 1
+    b2 = a * a - n
+    for step in range(max_steps):
+        b = math.isqrt(b2)
+        if b * b == b2:
+            return a - b if a - b > 1 else None
+        b2 += 2 * a + 1
+        a += 1
+        if step & 4095 == 0 and budget.expired():
+            break
+    return None
+
+def _convergents(num: int, den: int) -> Iterator[Tuple[int, int]]:
+    h0, h1, k0, k1 = 0, 1, 1, 0
+    while den:
+        a, (num, den) = num // den, (den, num % den)
+        h0, h1 = h1, a * h1 + h0
+        k0, k1 = k1, a * k1 + k0
+        yield h1, k1
+
+def wiener(n: int, e: int, budget: _Budget) -> Optional[int]:
+    """Recover a small private exponent (d < n^0.25 / 3) from the continued fraction of e/n."""
+    for k, d in _convergents(e, n):
+        if k == 0 or (e * d - 1) % k:
+            continue
+        phi = (e * d - 1) // k
+        s = n - phi + 1
+        root, exact = iroot(s * s - 4 * n, 2) if s * s >= 4 * n else (0, False)
+        if exact and (s + root) % 2 == 0:
+            p = (s + root) // 2
+            if 1 < p < n and n % p == 0:
+                return p
+    return None
+
+def pollard_pm1(n: int, budget: _Budget, bound: int = 1_000_000) -> Optional[int]:
+    """Factor n when p - 1 is bound-smooth."""
+    a = 2
+    primes = _small_primes(bound)
+    log_b = math.log(bound)
+    for i, p in enumerate(primes):
+        a = pow(a, p ** int(log_b / math.log(p)), n)
+        if i % 512 == 511 or i == len(primes) - 1:
+            g = math.gcd(a - 1, n)
+            if 1 < g < n:
+                return g
+            if g == n or budget.expired():
+                return None
+    return None
+
+def pollard_rho(n: int, budget: _Budget, max_steps: int = 1 << 20) -> Optional[int]:
+    """Brent's variant of Pollard rho, runs until a factor, max_steps squarings or the end of the budget."""
+    if n % 2 == 0:
+        return 2
+    steps = 0
+    for c in range(1, 64):
+        y, r, q, g = 2, 1, 1, 1
+        x = ys = y
+        while g == 1:
+            if steps >= max_steps:
+                return None
+            x = y
+            for j in range(r):
+                y = (y * y + c) % n
+                if j & 4095 == 4095 and budget.expired():
+                    return None
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += 128
+                if k & 4095 == 0 and budget.expired():
+                    return None
+            steps += 2 * r
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if 1 < g < n:
+            return g
+    return None
+
+def small_e_root(n: int, e: int, c: int, budget: _Budget, max_k: int = 100_000) -> Optional[int]:
+    """m when m^e barely wraps n: m^e = c + k*n for a small k."""
+    for k in range(max_k):
+        m, exact = iroot(c + k * n, e)
+        if exact:
+            return m
+        if k & 255 == 255 and budget.expired():
+            break
+    return None
+
+def _private(n: int, e: int, p: int) -> Tuple[int, int, Optional[int]]:
+    q = n // p
+    p, q = min(p, q), max(p, q)
+    try:
+        d = pow(e, -1, (p - 1) * (q - 1))
+    except ValueError:
+        d = None
+    return p, q, d
+
+def common_modulus(n: int, e1: int, c1: int, e2: int, c2: int) -> Optional[int]:
+    """Same message encrypted under one n with coprime exponents."""
+    g, a, b = _egcd(e1, e2)
+    if g != 1 or math.gcd(c1, n) != 1 or math.gcd(c2, n) != 1:
+        return None
+    return pow(c1, a, n) * pow(c2, b, n) % n
+
+def hastad(e: int, pairs: Sequence[Tuple[int, int]]) -> Optional[int]:
+    """Same message sent to e recipients with exponent e, pairs are (n, c)."""
+    if len(pairs) < e:
+        return None
+    pairs = list(pairs[:e])
+    N = 1
+    for n, _ in pairs:
+        if math.gcd(N, n) != 1:
+            return None
+        N *= n
+    x = 0
+    for n, c in pairs:
+        Ni = N // n
+        x += c * Ni * pow(Ni, -1, n)
+    m, exact = iroot(x % N, e)
+    return m if exact else None
+
+# (name, attack, share of a target's slice of the budget, 0.0 = not time boxed);
+# the cheap ones run on every target before any of the slow ones. The
+# shares add up to 1 so a target never takes more than its slice
+CHEAP_FACTORING: List[Tuple[str, Callable[..., Optional[int]], float]] = [
+    ("trial division", lambda n, e, budget: trial_division(n, budget), 0.0),
+    ("wiener", wiener, 0.0),
+    ("fermat", lambda n, e, budget: fermat(n, budget), 0.1),
+]
+SLOW_FACTORING: List[Tuple[str, Callable[..., Optional[int]], float]] = [
+    ("pollard p-1", lambda n, e, budget: pollard_pm1(n, budget), 0.3),
+    ("pollard rho", lambda n, e, budget: pollard_rho(n, budget), 0.6),
+]
+FACTORING = CHEAP_FACTORING + SLOW_FACTORING
+
+def attack(targets: Sequence[Target], timeout: Optional[float] = 30.0) -> List[Result]:
+    """
+    Attack (n, e, c) or (n, e) targets, cheapest first, returns one Result per broken target.
+
+    The cheap factoring attacks run across all targets first, then what
+    is left of the timeout is split evenly between the unsolved targets
+    for Pollard p-1 and rho, so one hard modulus cannot starve the rest.
+    Every attack also stops at the overall deadline. With timeout=None
+    the attacks run to their own step bounds.
+    """
+    budget = _Budget(timeout)
+    # (n, e) without a ciphertext is a factoring-only target
+    targets = [(int(t[0]), int(t[1]), None if len(t) < 3 or t[2] is None else int(t[2])) for t in targets]
+    results: List[Result] = []
+    solved = set()
+
+    def record(name: str, t0: float, idx: Sequence[int], p: Optional[int], m: Optional[int]) -> None:
+        seconds = time.time() - t0
+        for i in idx:
+            n, e, c = targets[i]
+            p_i = q = d = None
+            m_i = m
+            if p is not None:
+                p_i, q, d = _private(n, e, math.gcd(p, n))
+                if c is not None and d is not None and m_i is None:
+                    m_i = pow(c, d, n)
+            results.append(Result(name, seconds, tuple(idx), p_i, q, d, m_i))
+            solved.add(i)
+
+    t0 = time.time()
+    by_n: Dict[int, List[int]] = {}
+    for i, (n, e, c) in enumerate(targets):
+        by_n.setdefault(n, []).append(i)
+    for n, idx in by_n.items():
+        with_c = [i for i in idx if targets[i][2] is not None]
+        for a in range(len(with_c)):
+            for b in range(a + 1, len(with_c)):
+                i, j = with_c[a], with_c[b]
+                if i in solved:
+                    break
+                m = common_modulus(n, targets[i][1], targets[i][2], targets[j][1], targets[j][2])
+                if m is not None:
+                    record("common modulus", t0, [i, j], None, m)
+
+    t0 = time.time()
+    moduli = list(by_n)
+    for a in range(len(moduli)):
+        for b in range(a + 1, len(moduli)):
+            g = math.gcd(moduli[a], moduli[b])
+            if 1 < g < moduli[a] and 1 < g < moduli[b]:
+                for n in (moduli[a], moduli[b]):
+                    todo = [i for i in by_n[n] if i not in solved]
+                    if todo:
+                        record("shared factor", t0, todo, g, None)
+
+    t0 = time.time()
+    by_e: Dict[int, List[int]] = {}
+    for i, (n, e, c) in enumerate(targets):
+        if c is not None and i not in solved and e <= 64:
+            by_e.setdefault(e, []).append(i)
+    for e, idx in by_e.items():
+        distinct = list({targets[i][0]: i for i in idx}.values())
+        if len(distinct) >= e > 1:
+            m = hastad(e, [(targets[i][0], targets[i][2]) for i in distinct])
+            if m is not None:
+                record("hastad broadcast", t0, distinct[:e], None, m)
+
+    for i, (n, e, c) in enumerate(targets):
+        if i in solved or c is None or e > 64:
+            continue
+        t0 = time.time()
+        m = small_e_root(n, e, c, budget.within(0.5))
+        if m is not None:
+            record("small e root", t0, [i], None, m)
+
+    for stage in (CHEAP_FACTORING, SLOW_FACTORING):
+        todo = [i for i in range(len(targets)) if i not in solved]
+        for k, i in enumerate(todo):
+            if budget.expired():
+                break
+            n, e, _ = targets[i]
+            left = None if budget.deadline is None else budget.deadline - time.time()
+            part = None if left is None else left / (len(todo) - k)
+            for name, fn, share in stage:
+                if budget.expired():
+                    break
+                t0 = time.time()
+                p = fn(n, e, budget if share == 0.0 or part is None else budget.within(part * share))
+                if p:
+                    record(name, t0, [i], p, None)
+                    break
+    return results
+
+def read_moduli(path: Union[str, Path]) -> List[int]:
+    """One modulus per line, decimal or hex (0x optional), '#' starts a comment."""
+    moduli = []
+    with open(path, "r", encoding="ascii") as f:
+        for line in f:
+            token = line.split("#", 1)[0].replace(",", " ").replace(":", " ").split()
+            if not token:
+                continue
+            t = token[0].lower()
+            if t.startswith("0x"):
+                moduli.append(int(t, 16))
+            else:
+                try:
+                    moduli.append(int(t))
+                except ValueError:
+                    moduli.append(int(t, 16))
+    return moduli
+
+# Python ints divide in quadratic time, past a few hundred moduli the
+# trees only pay off with gmpy2
+GMPY2_WARN_AT = 256
+
+class _Levels:
+    """Product tree levels, kept in memory or pickled to a spill directory one file per level."""
+
+    def __init__(self, spill_dir: Optional[Union[str, Path]]):
+        self._tmp = tempfile.TemporaryDirectory(dir=spill_dir) if spill_dir is not None else None
+        self._mem: List[List[Any]] = []
+        self.count = 0
+
+    def push(self, level: List[Any]) -> None:
+        if self._tmp is None:
+            self._mem.append(level)
+        else:
+            with open(os.path.join(self._tmp.name, f"{self.count}.pkl"), "wb") as f:
+                pickle.dump(level, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.count += 1
+
+    def get(self, k: int) -> List[Any]:
+        if self._tmp is None:
+            return self._mem[k]
+        with open(os.path.join(self._tmp.name, f"{k}.pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def close(self) -> None:
+        self._mem = []
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+def batch_gcd(moduli: Union[Iterable[int], str, Path], *,
+              spill_dir: Optional[Union[str, Path]] = None) -> List[Tuple[int, int, int]]:
+    """
+    Shared factors between moduli, returns (index, n, gcd) for every n with a nontrivial one.
+
+    moduli is a list of ints or a file for read_moduli(). gcd == n means
+    every factor of n is shared (e.g. a duplicated modulus). Emits a
+    RuntimeWarning for GMPY2_WARN_AT moduli or more when gmpy2 is missing.
+    """
+    if isinstance(moduli, (str, Path)):
+        moduli = read_moduli(moduli)
+    moduli = list(moduli)
+    if gmpy2 is None and len(moduli) >= GMPY2_WARN_AT:
+        warnings.warn(
+            f"batch_gcd on {len(moduli)} moduli without gmpy2 is slower than pairwise gcds, "
+            "install it with: pip install pydecodr[fast]",
+            RuntimeWarning, stacklevel=2,
+        )
+    mpz = gmpy2.mpz if gmpy2 is not None else int
+    gcd = gmpy2.gcd if gmpy2 is not None else math.gcd
+    level = [mpz(n) for n in moduli]
+    if len(level) < 2:
+        return []
+
+    levels = _Levels(spill_dir)
+    try:
+        while len(level) > 1:
+            levels.push(level)
+            nxt = [level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                nxt.append(level[-1])
+            level = nxt
+
+        # walk back down: every node keeps the product of all moduli mod node^2
+        rems = level
+        for k in range(levels.count - 1, -1, -1):
+            nodes = levels.get(k)
+            rems = [rems[i // 2] % (node * node) for i, node in enumerate(nodes)]
+        leaves = nodes
+    finally:
+        levels.close()
+
+    found = []
+    for i, (n, r) in enumerate(zip(leaves, rems)):
+        g = gcd(r // n, n)
+        if g != 1:
+            found.append((i, int(n), int(g)))
+    return found
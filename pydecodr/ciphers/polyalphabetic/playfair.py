@@ -1,11 +1,25 @@
 """
 pydecodrs.ciphers.polyalphabetic.playfair - playfair cipher (5x5, I/J merged)
+
+PlayfairCipher compiles a key once into 625-entry digram -> digram tables
+for both directions, encrypt/decrypt are then a single gather over the
+digram indexes of the text.
+
+crack anneals over squares (pydecodr.utils.squares) held as a 25-entry
+key array (cell -> letter) plus its inverse (letter -> cell). The digram
+rules only depend on the two cells, so decryption is a lookup in a fixed
+625-entry cell-pair table followed by key[], and a whole batch of
+candidate squares is decrypted and quadgram-scored with a few array ops.
 """
 
 from __future__ import annotations
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import sys
 import argparse
+import random
+from functools import partial
+import numpy as np
+from pydecodr.utils import scoring, runner, squares
 
 ALPHABET_25 = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
 
@@ -22,82 +36,170 @@ def _normalize_key(key: str) -> str:
         
     return "".join(out)
 
-def _build_square(key: str) -> List[List[str]]:
+def _build_square(key: str) -> str:
     norm = _normalize_key(key)
-    rest = "".join(ch for ch in ALPHABET_25 if ch not in norm)
-    seq = norm + rest
-    return [list(seq[i: i + 5]) for i in range(0, 25, 5)]
-
-def _pos(square: List[List[str]], ch: str) -> Tuple[int, int]:
-    for r in range(5):
-        for c in range(5):
-            if square[r][c] == ch:
-                return r, c
-    raise ValueError(f"Letter {ch!r} not found in square")
-
-def _prepare_text(text: str, pad: str = "X") -> List[Tuple[str, str]]:
-    s = []
-    for ch in text.upper():
-        if ch.isalpha():
-            s.append("I" if ch == "J" else ch)
-    
-    pairs: List[Tuple[str, str]] = []
-    i = 0
-    while i < len(s):
-        a = s[i]
-        b = s[i + 1] if i + 1 < len(s) else None
-        if b is None:
-            pairs.append((a, pad))
-            i += 1
-        elif a == b:
-            pairs.append((a, pad))
-            i += 1
-        else:
-            pairs.append((a, b))
-            i += 2
-    return pairs
-
-def __process_pair(a: str, b: str, square: List[List[str]], decrypt: bool = False) -> Tuple[str, str]:
-    ra, ca = _pos(square, a)
-    rb, cb = _pos(square, b)
-
-    if ra == rb:
-        if decrypt:
-            return square[ra][(ca - 1) % 5], square[rb][(cb - 1) % 5] 
-        else:
-            return square[ra][(ca + 1) % 5], square[rb][(cb + 1) % 5]
-    
-    if ca == cb:
-        if decrypt:
-            return square[(ra - 1) % 5][ca], square[(rb - 1) % 5][cb]
-        else:
-            return square[(ra + 1) % 5][ca], square[(rb + 1) % 5][cb]
-    
-    return square[ra][cb], square[rb][ca]
+    return norm + "".join(ch for ch in ALPHABET_25 if ch not in norm)
+
+def _cell_pair_table(decrypt: bool) -> np.ndarray:
+    """(625, 2) table: the output cells of the cell pair (a, b) at index a * 25 + b."""
+    step = -1 if decrypt else 1
+    table = np.empty((625, 2), dtype=np.uint8)
+    for a in range(25):
+        ra, ca = divmod(a, 5)
+        for b in range(25):
+            rb, cb = divmod(b, 5)
+            if ra == rb:
+                out = (ra * 5 + (ca + step) % 5, rb * 5 + (cb + step) % 5)
+            elif ca == cb:
+                out = (((ra + step) % 5) * 5 + ca, ((rb + step) % 5) * 5 + cb)
+            else:
+                out = (ra * 5 + cb, rb * 5 + ca)
+            table[a * 25 + b] = out
+    return table
+
+_ENC_PAIRS = _cell_pair_table(decrypt=False)
+_DEC_PAIRS = _cell_pair_table(decrypt=True)
+_PAIR_CELLS = np.stack(np.divmod(np.arange(625), 25), axis=1)
+
+# packed two bytes per entry, so one 1-D gather yields the interleaved cells
+_DEC_CELLS = _DEC_PAIRS.view(np.uint16).ravel()
+
+# 25-letter index -> A..Z index for the quadgram table
+_TO_26 = np.array([ord(ch) - 65 for ch in ALPHABET_25], dtype=np.intp)
+_FROM_26 = np.full(26, 255, dtype=np.uint8)
+_FROM_26[_TO_26] = np.arange(25, dtype=np.uint8)
+_FROM_26[ord("J") - 65] = _FROM_26[ord("I") - 65]
+
+_LETTERS = np.frombuffer(ALPHABET_25.encode("ascii"), dtype=np.uint8)
+
+_CELLS = squares.CELLS
+
+def _letters_25(text: str) -> np.ndarray:
+    return _FROM_26[scoring.letter_indices(text)]
+
+def _pad_index(pad: str) -> int:
+    idx = _FROM_26[scoring.letter_indices(pad[:1])]
+    if idx.size == 0:
+        raise ValueError("pad must be a letter A-Z")
+    return int(idx[0])
+
+def _prepare_text(text: str, pad: str = "X") -> np.ndarray:
+    """Letters of text as 25-letter indexes, split into digrams with pad after doubles and at the end."""
+    s = _letters_25(text)
+    # a pad goes in wherever a doubled letter would start a digram; each
+    # insertion shifts the digram boundaries after it by one
+    inserts: List[int] = []
+    for d in np.flatnonzero(s[:-1] == s[1:]).tolist():
+        if (d + len(inserts)) % 2 == 0:
+            inserts.append(d + 1)
+    p = _pad_index(pad)
+    s = np.insert(s, inserts, p)
+    if s.size % 2:
+        s = np.append(s, np.uint8(p))
+    return s
+
+def _to_text(letters: np.ndarray) -> str:
+    return _LETTERS[letters].tobytes().decode("ascii")
+
+class PlayfairCipher:
+    """
+    A key compiled into digram tables for both directions.
+
+    Digrams are indexed a * 25 + b by their 25-letter indexes, and each
+    table entry packs the two output letters, so a whole text is one
+    gather: encrypt_digrams()/decrypt_digrams() take an array of digram
+    indexes and return the interleaved output letters.
+    """
+
+    __slots__ = ("square", "_enc", "_dec")
+
+    def __init__(self, key: str):
+        self.square = _build_square(key)
+        cells = np.frombuffer(self.square.encode("ascii"), dtype=np.uint8)
+        letters = _FROM_26[cells - 65]
+        self._enc = self._table(letters, _ENC_PAIRS)
+        self._dec = self._table(letters, _DEC_PAIRS)
+
+    @staticmethod
+    def _table(letters: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+        inp = letters[_PAIR_CELLS].astype(np.intp)
+        table = np.empty((625, 2), dtype=np.uint8)
+        table[inp[:, 0] * 25 + inp[:, 1]] = letters[pairs]
+        return table.view(np.uint16).ravel()
+
+    def encrypt_digrams(self, digrams: np.ndarray) -> np.ndarray:
+        return self._enc[digrams].view(np.uint8)
+
+    def decrypt_digrams(self, digrams: np.ndarray) -> np.ndarray:
+        return self._dec[digrams].view(np.uint8)
+
+    @staticmethod
+    def digrams(letters: np.ndarray) -> np.ndarray:
+        """Digram indexes of an even-length 25-letter index array."""
+        return letters[0::2].astype(np.intp) * 25 + letters[1::2]
+
+    def encrypt(self, plaintext: str, pad: str = "X") -> str:
+        return _to_text(self.encrypt_digrams(self.digrams(_prepare_text(plaintext, pad=pad))))
+
+    def decrypt(self, ciphertext: str) -> str:
+        s = _letters_25(ciphertext)
+        if s.size % 2 != 0:
+            raise ValueError("Ciphertext length must be even!")
+        return _to_text(self.decrypt_digrams(self.digrams(s)))
 
 def encrypt(plaintext: str, key: str, pad: str = "X") -> str:
-    square = _build_square(key)
-    digrams = _prepare_text(plaintext, pad=pad)
-    out: List[str] = []
-    for a, b in digrams:
-        ea, eb = __process_pair(a, b, square, decrypt=False)
-        out.extend([ea, eb])
-    
-    return "".join(out)
+    return PlayfairCipher(key).encrypt(plaintext, pad=pad)
 
 def decrypt(ciphertext: str, key: str, pad: str = "X") -> str:
-    square = _build_square(key)
-    s = [("I" if ch == "J" else ch) for ch in ciphertext.upper() if ch.isalpha()]
-    if len(s) % 2 != 0:
-        raise ValueError("Ciphertext length must be even!")
-    out: List[str] = []
-    for i in range(0, len(s), 2):
-        a, b = s[i], s[i + 1]
-        da, db = __process_pair(a, b, square, decrypt=True)
-        out.extend([da, db])
-
-    return "".join(out)
-
+    return PlayfairCipher(key).decrypt(ciphertext)
+
+_MOVES, _MOVE_CDF = squares.move_table(flips=True)
+
+def _scores(keys: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Quadgram score of the decryption of the digrams (first[i], second[i]) under every row of keys."""
+    rows = np.arange(keys.shape[0])[:, None]
+    pos = np.empty_like(keys)
+    pos[rows, keys] = _CELLS
+    cells = np.ascontiguousarray(_DEC_CELLS[pos[:, first] * 25 + pos[:, second]]).view(np.uint8)
+    return scoring.quadgram_scores(_TO_26[keys].ravel()[cells + rows * 25])
+
+def _anneal(seed: int, cipher: np.ndarray, iterations: int, temperature: float,
+            target: float) -> Tuple[float, np.ndarray]:
+    first = cipher[0::2].astype(np.intp)
+    second = cipher[1::2].astype(np.intp)
+    return squares.anneal(np.random.default_rng(seed), partial(_scores, first=first, second=second),
+                          _MOVES, _MOVE_CDF, iterations, temperature, target)
+
+def _canonical(key: np.ndarray) -> bytes:
+    # the same square shifted cyclically by rows or columns encrypts identically
+    r, c = divmod(int(np.flatnonzero(key == 0)[0]), 5)
+    return np.roll(key.reshape(5, 5), (-r, -c), axis=(0, 1)).tobytes()
+
+def crack(ciphertext: str, restarts: int = 10, iterations: int = 3000000, timeout: Optional[float] = None,
+          temperature: Optional[float] = None, limit: int = 5, seed: Optional[int] = None,
+          confirm: int = 0, workers: Optional[int] = 1,
+          target: Optional[float] = None) -> List[Tuple[str, str, float]]:
+    cipher = _letters_25(ciphertext)
+    if cipher.size < 8 or cipher.size % 2:
+        raise ValueError("Ciphertext needs an even number of letters, at least 8")
+    if temperature is None:
+        # fixed temperature, score deltas grow with the length of the text
+        temperature = 0.04 * cipher.size
+    if target is None:
+        target = squares.default_target(cipher.size)
+
+    ranked = runner.run_restarts(
+        _anneal, restarts, (cipher, iterations, temperature, target),
+        workers=workers, limit=limit, target=target, timeout=timeout,
+        confirm=confirm if workers == 1 else 0,
+        seed=random.randrange(1 << 30) if seed is None else seed,
+        key=_canonical,
+    )
+    results = []
+    for score, key in ranked:
+        k = "".join(ALPHABET_25[i] for i in key)
+        results.append((k, decrypt(ciphertext, k), score))
+    return results
 
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -105,9 +207,13 @@ def _build_argparser() -> argparse.ArgumentParser:
         description="Playfair cipher"
     )
 
-    p.add_argument("action", choices=["encrypt", "decrypt"], help="action to perform")
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help="action to perform")
     p.add_argument("text", help="plaintext or ciphertext (quote if contains spaces)")
-    p.add_argument("key", help="Playfair key (string)")
+    p.add_argument("key", nargs="?", default=None, help="Playfair key (string, not needed for crack)")
+    p.add_argument("--restarts", type=int, default=10, help="number of annealing restarts for crack (default: 10)")
+    p.add_argument("--iterations", type=int, default=3000000, help="moves per restart (default: 3000000)")
+    p.add_argument("--timeout", type=float, default=None, help="wall-clock limit in seconds for crack")
+    p.add_argument("--workers", type=int, default=1, help="worker processes, 0 uses every core (default: 1)")
 
     return p
 
@@ -126,6 +232,11 @@ if __name__ == "__main__":
         elif action == "decrypt":
             print(decrypt(text, key))
             sys.exit(0)
+        elif action == "crack":
+            for k, pt, score in crack(text, restarts=args.restarts, iterations=args.iterations,
+                                      timeout=args.timeout, workers=args.workers or None):
+                print(f"{k} ({score:.2f}): {pt}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
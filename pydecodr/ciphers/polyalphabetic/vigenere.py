@@ -3,11 +3,21 @@ pydecodr.ciphers.polyalphabetic.vigenere - Vignere cipher
 
 E_i = (P_i + K_i) mod 26
 D_i = (C_i - K_i) mod 26
+
+crack works on a uint8 letter array: key lengths are ranked with the
+Friedman index of coincidence over strided column views plus Kasiski
+repeat spacing, each column is then solved as a Caesar by chi-squared
+and the key is polished with a quadgram hill climb.
 """
 
 from __future__ import annotations
 import sys
 import argparse
+import numpy as np
+from pydecodr.utils import scoring
+
+ENGLISH_IOC = float((scoring.ENGLISH_FREQ ** 2).sum())
+RANDOM_IOC = 1.0 / 26
 
 def _shift(ch: str, k: int, decrypt: bool = False) -> str:
     if not ch.isalpha():
@@ -47,15 +57,123 @@ def decrypt(ciphertext: str, key: str) -> str:
             out.append(ch)
     return "".join(out)
 
+def _column_counts(idx: np.ndarray, length: int) -> np.ndarray:
+    usable = idx.size - idx.size % length
+    cols = idx[:usable].reshape(-1, length)
+    return np.bincount((cols + np.arange(0, 26 * length, 26, dtype=np.intp)).ravel(),
+                       minlength=26 * length).reshape(length, 26)
+
+def _ioc(counts: np.ndarray) -> np.ndarray:
+    n = counts.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(n > 1, (counts * (counts - 1)).sum(axis=-1) / (n * (n - 1)), 0.0)
+
+def _kasiski(idx: np.ndarray, max_len: int, max_spacings: int = 50000) -> np.ndarray:
+    frac = np.zeros(max_len + 1)
+    if idx.size < 6:
+        return frac
+    a = idx.astype(np.int32)
+    trigrams = (a[:-2] * 26 + a[1:-1]) * 26 + a[2:]
+    order = np.argsort(trigrams, kind="stable")
+    repeated = trigrams[order[1:]] == trigrams[order[:-1]]
+    spacings = (order[1:] - order[:-1])[repeated][:max_spacings]
+    if spacings.size:
+        lengths = np.arange(1, max_len + 1)
+        frac[1:] = (spacings[:, None] % lengths == 0).mean(axis=0)
+    return frac
+
+def key_lengths(ciphertext: str, max_len: int = 100, top: int = 3) -> list[tuple[int, float]]:
+    """Rank candidate key lengths, returns (length, score) pairs, higher score first."""
+    idx = scoring.letter_indices(ciphertext)
+    max_len = max(1, min(max_len, idx.size // 4))
+    lengths = np.arange(1, max_len + 1)
+    ioc = np.array([_ioc(_column_counts(idx, L)).mean() for L in lengths])
+
+    # z-score of the mean column IoC against random letters: a multiple of
+    # the true length has the same expected IoC but shorter, noisier
+    # columns, so it scores lower than the length itself
+    per_col = idx.size // lengths
+    sigma = np.sqrt(2.0 * RANDOM_IOC / (per_col * (per_col - 1) * lengths))
+    z = (ioc - RANDOM_IOC) / sigma
+
+    # repeat spacings divisible by L beyond the 1/L expected by chance
+    kasiski = np.clip(_kasiski(idx, max_len)[1:] - 1.0 / lengths, 0.0, None)
+    combined = z * (1.0 + kasiski)
+
+    ranked = np.argsort(-combined, kind="stable")[:top]
+    return [(int(lengths[i]), float(combined[i])) for i in ranked]
+
+def _solve_columns(idx: np.ndarray, length: int) -> np.ndarray:
+    counts = _column_counts(idx, length) if idx.size >= length else np.zeros((length, 26))
+    rolled = counts[:, (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26]
+    return np.argmin(scoring.chi_squared(rolled), axis=1).astype(np.uint8)
+
+def _refine(idx: np.ndarray, shifts: np.ndarray, max_passes: int = 4) -> np.ndarray:
+    length = shifts.size
+    table = scoring.quadgram_table()
+    n = idx.size
+    if n < 4:
+        return shifts
+    plain = (idx + 26 - shifts[np.arange(n) % length]) % 26
+    cand = np.arange(26, dtype=np.uint8)[:, None, None]
+    offsets = np.arange(4)
+    for _ in range(max_passes):
+        improved = False
+        for j in range(length):
+            starts = np.arange(j - 3, n - 3, length)
+            wins = np.unique((starts[:, None] + offsets).ravel())
+            wins = wins[(wins >= 0) & (wins < n - 3)]
+            pos = wins[:, None] + offsets
+            letters = np.where(pos % length == j, (idx[pos] + 26 - cand) % 26, plain[pos])
+            gram = letters.astype(np.int32) @ np.array([17576, 676, 26, 1], dtype=np.int32)
+            totals = table[gram].sum(axis=1, dtype=np.float64)
+            s = int(np.argmax(totals))
+            gain = totals[s] - totals[shifts[j]]
+            if s != shifts[j] and gain > 1e-9:
+                shifts[j] = s
+                plain[j::length] = (idx[j::length] + 26 - s) % 26
+                improved = True
+        if not improved:
+            break
+    return shifts
+
+def _shortest_period(shifts: np.ndarray) -> np.ndarray:
+    n = shifts.size
+    for p in range(1, n):
+        if n % p == 0 and (shifts == np.tile(shifts[:p], n // p)).all():
+            return shifts[:p]
+    return shifts
+
+def crack(ciphertext: str, max_key_len: int = 100, candidates: int = 3, refine: bool = True,
+          limit: int | None = None) -> list[tuple[str, str, float]]:
+    idx = scoring.letter_indices(ciphertext)
+    if idx.size == 0:
+        raise ValueError("Ciphertext has no letters")
+
+    results: dict[str, float] = {}
+    for length, _ in key_lengths(ciphertext, max_len=max_key_len, top=candidates):
+        shifts = _solve_columns(idx, length)
+        if refine:
+            # long columns are already solved by chi-squared, the climb only
+            # needs enough text per column to fix the short ones
+            shifts = _refine(idx[: max(2000, 40 * length)], shifts)
+        shifts = _shortest_period(shifts)
+        key = "".join(chr(65 + int(s)) for s in shifts)
+        if key not in results:
+            results[key] = scoring.quadgram_score((idx + 26 - np.tile(shifts, -(-idx.size // shifts.size))[:idx.size]) % 26)
+
+    ranked = sorted(results.items(), key=lambda kv: (-kv[1], len(kv[0])))[:limit]
+    return [(key, decrypt(ciphertext, key), score) for key, score in ranked]
 
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="pydecodr.ciphers.polyalphabetic.vigenere",
         description="Vigenere cipher"
     )
-    p.add_argument("action", choices=["encrypt", "decrypt"], help="action to perform")
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help="action to perform")
     p.add_argument("text", help="plaintext or ciphertext (quote if contains spaces)")
-    p.add_argument("key", help="initial key (strings)")
+    p.add_argument("key", nargs="?", default=None, help="initial key (strings), not needed for crack")
+    p.add_argument("--max-key-len", type=int, default=100, help="longest key length to try (crack, default: 100)")
 
     return p
 
@@ -74,6 +192,10 @@ if __name__ == "__main__":
         elif action == "decrypt":
             print(decrypt(text, key))
             sys.exit(0)
+        elif action == "crack":
+            for k, pt, score in crack(text, max_key_len=args.max_key_len):
+                print(f"{k} ({score:.2f}): {pt}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
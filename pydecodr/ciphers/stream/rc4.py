@@ -1,46 +1,166 @@
 """
 pydecodr.ciphers.stream.rc4 - RC4 stream cipher
+
+RC4State runs the keystream through pycryptodome's ARC4 (in C) and
+tracks how far it got, so a stream can be processed in chunks of any
+size and picked up again later (copy() it or pickle it). skip() discards
+keystream for the RC4-drop[n] variants and process_file() decrypts a
+file of any size with one reusable buffer.
+
+crack() runs a wordlist against a ciphertext with a known plaintext
+prefix: per candidate it runs the KSA and only as many PRGA steps as the
+prefix needs, wordlist byte ranges are spread over processes.
 """
 
 from __future__ import annotations
-from typing import Union, List, Generator
+from pathlib import Path
+from typing import Union, BinaryIO, List, Optional, Tuple
 import sys
 import argparse
+from Crypto.Cipher import ARC4
+from pydecodr.utils import ioutils, runner, scoring
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# the KSA only reads the first 256 key bytes
+_MAX_KEY = 256
+_SKIP_CHUNK = 1 << 20
+
+class RC4State:
+    """
+    Resumable keystream position: the key and the number of keystream
+    bytes used so far. The PRGA runs in pycryptodome's ARC4, which cannot
+    be copied or pickled, so copies and unpickled states rebuild it with
+    ARC4.new(key, drop=offset) the first time they are used.
+    """
+
+    __slots__ = ("_key", "_offset", "_cipher")
+
+    def __init__(self, key: Union[str, bytes], *, drop: int = 0, encoding: str = "utf-8"):
+        key_b = key.encode(encoding) if isinstance(key, str) else bytes(key)
+        if not key_b:
+            raise ValueError("Key cannot be empty.")
+        self._key = key_b[:_MAX_KEY]
+        self._offset = 0
+        self._cipher = None
+        if drop:
+            self.skip(drop)
+
+    @property
+    def offset(self) -> int:
+        """Keystream bytes consumed so far, drop included."""
+        return self._offset
+
+    def __getstate__(self) -> Tuple[bytes, int]:
+        return self._key, self._offset
+
+    def __setstate__(self, state: Tuple[bytes, int]) -> None:
+        self._key, self._offset = state
+        self._cipher = None
+
+    def _arc4(self):
+        if self._cipher is None:
+            self._cipher = ARC4.new(self._key, drop=self._offset)
+        return self._cipher
 
-def _ksa(key_bytes: bytes) -> List[int]:
-    key_length = len(key_bytes)
-    S = list(range(256))
-    j = 0
-    for i in range(256):
-        j = (j + S[i] + key_bytes[i % key_length]) % 256
-        S[i], S[j] = S[j], S[i]
+    def copy(self) -> "RC4State":
+        other = RC4State.__new__(RC4State)
+        other.__setstate__(self.__getstate__())
+        return other
 
-    return S
+    def keystream(self, n: int) -> bytearray:
+        out = bytearray(n)
+        self.process_into(out)
+        return out
 
-def _prga(S: List[int]) -> Generator[int, None, None]:
-    i, j = 0, 0
+    def skip(self, n: int) -> None:
+        if n < 0:
+            raise ValueError("Cannot skip a negative number of bytes.")
+        if self._cipher is not None:
+            zeros = bytes(min(n, _SKIP_CHUNK))
+            for left in range(n, 0, -len(zeros)):
+                self._cipher.encrypt(zeros[:left])
+        # without a live cipher the skip is folded into the next ARC4.new drop
+        self._offset += n
+
+    def process(self, buf: BytesLike) -> bytes:
+        out = self._arc4().encrypt(buf)
+        self._offset += len(out)
+        return out
+
+    def process_into(self, buf: Union[bytearray, memoryview]) -> None:
+        """XOR the keystream into a writable buffer in place."""
+        view = memoryview(buf).cast("B")
+        view[:] = self._arc4().encrypt(view)
+        self._offset += view.nbytes
+
+def process_file(src: BinaryIO, dst: BinaryIO, state: RC4State, chunk_size: int = 1 << 20) -> int:
+    """Stream src through state into dst, returns the number of bytes written."""
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    total = 0
     while True:
-        i = (i + 1) % 256
-        j = (j + S[i]) % 256
-        S[i], S[j] = S[j], S[i]
-        K = S[(S[i] + S[j]) % 256]
-        yield K
-
-def _rc4_encrypt(data: bytes, key_bytes: bytes) -> bytes:
-    S = _ksa(key_bytes)
-    keystream = _prga(S)
-    return bytes(b ^ next(keystream) for b in data)
-
-def encrypt(plaintext: str, key: Union[str, bytes], *, encoding: str = 'utf-8') -> str:
+        n = src.readinto(buf)
+        if not n:
+            return total
+        state.process_into(view[:n])
+        dst.write(view[:n])
+        total += n
+
+def _rc4_encrypt(data: bytes, key_bytes: bytes, drop: int = 0) -> bytes:
+    return RC4State(key_bytes, drop=drop).process(data)
+
+def _crack_range(chunk: Tuple[int, int], path: str, prefix: bytes, known: bytes, drop: int) -> List[bytes]:
+    # pycryptodome runs the KSA and the drop in C, only len(prefix)
+    # keystream bytes are generated after that
+    new = ARC4.new
+    hits = []
+    for n, key in enumerate(ioutils.iter_wordlist(path, *chunk)):
+        if new(key[:_MAX_KEY], drop=drop).encrypt(prefix) == known:
+            hits.append(key)
+        if n & 4095 == 0 and runner.stop_requested():
+            break
+    return hits
+
+def crack(ciphertext: Union[str, BytesLike], wordlist: Union[str, Path], known: Union[str, bytes], *,
+          drop: int = 0, workers: Optional[int] = 1, first: bool = False,
+          timeout: Optional[float] = None) -> List[Tuple[bytes, bytes, float]]:
+    """
+    Try every line of wordlist as a key, keeping those whose plaintext starts with known.
+
+    ciphertext may be hex or raw bytes, drop skips that much keystream
+    first (RC4-drop[n]). Returns (key, plaintext, score) best score first,
+    first=True stops at the first hit.
+    """
+    ct = bytes.fromhex(ciphertext) if isinstance(ciphertext, str) else bytes(ciphertext)
+    known_b = known.encode() if isinstance(known, str) else bytes(known)
+    if not known_b:
+        raise ValueError("Known plaintext cannot be empty.")
+    if len(known_b) > len(ct):
+        raise ValueError("Known plaintext is longer than the ciphertext.")
+    if drop < 0:
+        raise ValueError("drop cannot be negative.")
+
+    workers = runner.default_workers() if workers is None else max(1, workers)
+    chunks = ioutils.wordlist_ranges(wordlist, 1 if workers == 1 else workers * 8)
+    keys = runner.run_chunks(_crack_range, chunks, (str(wordlist), ct[:len(known_b)], known_b, drop),
+                             workers=workers, first=first, timeout=timeout)
+    found = []
+    for key in dict.fromkeys(keys):
+        pt = _rc4_encrypt(ct, key, drop)
+        found.append((key, pt, scoring.score_text(pt)))
+    return sorted(found, key=lambda r: -r[2])
+
+def encrypt(plaintext: str, key: Union[str, bytes], *, encoding: str = 'utf-8', drop: int = 0) -> str:
     key_b = key.encode(encoding) if isinstance(key, str) else key
     if not key_b:
         raise ValueError("Key cannot be empty.")
 
     pt = plaintext.encode(encoding)
-    ct = _rc4_encrypt(pt, key_b)
+    ct = _rc4_encrypt(pt, key_b, drop)
     return ct.hex()
 
-def decrypt(ciphertext_hex: str, key: Union[str, bytes], *, encoding: str = 'utf-8') -> str:
+def decrypt(ciphertext_hex: str, key: Union[str, bytes], *, encoding: str = 'utf-8', drop: int = 0) -> str:
     key_b = key.encode(encoding) if isinstance(key, str) else key
     if not key_b:
         raise ValueError("Key cannot be empty.")
@@ -48,7 +168,7 @@ def decrypt(ciphertext_hex: str, key: Union[str, bytes], *, encoding: str = 'utf
         ct = bytes.fromhex(ciphertext_hex)
     except ValueError as e:
         raise ValueError("Ciphertext must be hex-encoded") from e
-    pt = _rc4_encrypt(ct, key_b)
+    pt = _rc4_encrypt(ct, key_b, drop)
     return pt.decode(encoding, errors='strict')
 
 def _build_argparser() -> argparse.ArgumentParser:
@@ -56,10 +176,13 @@ def _build_argparser() -> argparse.ArgumentParser:
         prog="pydecodr.ciphers.stream.rc4",
         description="RC4 stream cipher"
     )
-    p.add_argument("action", choices=["encrypt", "decrypt"], help="action to perform")
-    p.add_argument("data", help="plaintext (encrypt) or hex ciphertex (decrypt)")
-    p.add_argument("key", help="key for RC4 (string)")
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help="action to perform")
+    p.add_argument("data", help="plaintext (encrypt) or hex ciphertex (decrypt/crack)")
+    p.add_argument("key", help="key for RC4 (string), wordlist path for crack")
+    p.add_argument("--known", help="known plaintext prefix (crack)")
+    p.add_argument("--workers", type=int, default=None, help="processes for crack (default: all cores)")
     p.add_argument("--encoding", default="utf-8", help="text encoding (default: utf-8)")
+    p.add_argument("--drop", type=int, default=0, help="keystream bytes to discard first, RC4-drop[n] (default: 0)")
 
     return p
 
@@ -74,10 +197,16 @@ if __name__ == "__main__":
 
     try:
         if action == "encrypt":
-            print(encrypt(data, key, encoding=enc))
+            print(encrypt(data, key, encoding=enc, drop=args.drop))
             sys.exit(0)
         elif action == 'decrypt':
-            print(decrypt(data, key, encoding=enc))
+            print(decrypt(data, key, encoding=enc, drop=args.drop))
+            sys.exit(0)
+        elif action == "crack":
+            if not args.known:
+                raise ValueError("crack needs --known")
+            for k, pt, score in crack(data, key, args.known, drop=args.drop, workers=args.workers):
+                print(f"{k.decode(enc, errors='replace')} ({score:.3f}): {pt.decode(enc, errors='replace')}")
             sys.exit(0)
         else:
             parser.print_help()
@@ -1,22 +1,88 @@
 """
 pydecodr.ciphers.stream.repeating_xor - repeating-key XOR cipher
+
+crack ranks key sizes by the normalised Hamming distance between
+consecutive key-size blocks (popcount lookup table), reshapes the data
+into key-size columns and solves every column as a single-byte XOR in
+one matrix product.
 """
 
 from __future__ import annotations
-from typing import Union
+from typing import Union, List, Tuple
 import sys
 import argparse
+import numpy as np
+from pydecodr.ciphers.stream import xor
+from pydecodr.utils import scoring
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
 
 def _key_to_bytes(key: Union[str, bytes], encoding: str = 'utf-8') -> bytes:
-    if isinstance(key, bytes):
-        return key
     if not key:
         raise ValueError("Key cannot be empty")
+    if isinstance(key, bytes):
+        return key
     return key.encode(encoding)
 
+def _repeat(key: np.ndarray, n: int) -> np.ndarray:
+    # np.tile copies whole blocks, np.resize fills element by element
+    return np.tile(key, -(-n // key.size))[:n]
+
 def _xor_repeat(data: bytes, key_bytes: bytes) -> bytes:
-    klen = len(key_bytes)
-    return bytes(data[i] ^ key_bytes[i % klen] for i in range(len(data)))
+    arr = np.frombuffer(data, dtype=np.uint8)
+    key = np.frombuffer(key_bytes, dtype=np.uint8)
+    return (arr ^ _repeat(key, arr.size)).tobytes()
+
+def key_sizes(data: Union[str, xor.BytesLike], max_size: int = 40, top: int = 3,
+              sample: int = 1 << 16) -> List[Tuple[int, float]]:
+    """Rank key sizes by normalised Hamming distance, returns (size, distance) lowest first."""
+    arr = xor._as_array(data)[:sample]
+    sizes = [k for k in range(1, max_size + 1) if arr.size // k >= 2]
+    dists = []
+    for k in sizes:
+        blocks = arr[: arr.size - arr.size % k].reshape(-1, k)
+        bits = POPCOUNT[blocks[:-1] ^ blocks[1:]].sum(dtype=np.int64)
+        dists.append(bits / (k * (blocks.shape[0] - 1)))
+    order = np.argsort(dists, kind="stable")[:top]
+    return [(sizes[i], float(dists[i])) for i in order]
+
+def _solve_columns(arr: np.ndarray, size: int) -> Tuple[bytes, float]:
+    """Best single-byte key of every column, all columns scored in one (size, 256) product."""
+    usable = arr.size - arr.size % size
+    cols = arr[:usable].reshape(-1, size)
+    counts = np.bincount((cols + np.arange(0, 256 * size, 256, dtype=np.intp)).ravel(),
+                         minlength=256 * size).reshape(size, 256)
+    tail = np.bincount(arr[usable:] + np.arange(0, 256 * (arr.size - usable), 256, dtype=np.intp),
+                       minlength=256 * size).reshape(size, 256)
+    scores = (counts + tail) @ xor.XOR_LOG
+    key = scores.argmax(axis=1)
+    return key.astype(np.uint8).tobytes(), float(scores[np.arange(size), key].sum() / max(arr.size, 1))
+
+def _shortest_period(key: bytes) -> bytes:
+    n = len(key)
+    for p in range(1, n):
+        if n % p == 0 and key[:p] * (n // p) == key:
+            return key[:p]
+    return key
+
+def crack(data: Union[str, xor.BytesLike], max_key_size: int = 40, candidates: int = 3,
+          limit: int | None = None) -> List[Tuple[bytes, bytes, float]]:
+    arr = xor._as_array(data)
+    if arr.size == 0:
+        raise ValueError("Ciphertext cannot be empty")
+    # multiples of the real key size also have a low distance, so solve
+    # their divisors too and let the plaintext score decide
+    sizes = set()
+    for size, _ in key_sizes(arr, max_size=max_key_size, top=candidates):
+        sizes.update(d for d in range(1, size + 1) if size % d == 0)
+    raw = arr.tobytes()
+    found = {}
+    for size in sorted(sizes):
+        key = _shortest_period(_solve_columns(arr, size)[0])
+        if key not in found:
+            found[key] = scoring.score_text(_xor_repeat(raw[:4096], key))
+    ranked = sorted(found.items(), key=lambda kv: (-kv[1], len(kv[0])))[:limit]
+    return [(key, _xor_repeat(raw, key), score) for key, score in ranked]
 
 def encrypt(plaintext: str, key: Union[str, bytes], *, encoding: str = "utf-8") -> str:
     key_b = _key_to_bytes(key)
@@ -39,9 +105,10 @@ def _build_argparser() -> argparse.ArgumentParser:
         description="Repeating-key XOR"
     )
 
-    p.add_argument("action", choices=["encrypt", "decrypt"], help="action to perform")
-    p.add_argument('data', help="plaintext (encrypt) or hex ciphertext (decrypt)")
-    p.add_argument("key", help="XOR key (string)")
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help="action to perform")
+    p.add_argument('data', help="plaintext (encrypt) or hex ciphertext (decrypt/crack)")
+    p.add_argument("key", nargs="?", default=None, help="XOR key (string), not needed for crack")
+    p.add_argument("--max-key-size", type=int, default=40, help="largest key size to try (crack, default: 40)")
     p.add_argument("--encoding", default="utf-8", help="text encoding (default: utf-8)")
 
     return p
@@ -62,6 +129,10 @@ if __name__ == "__main__":
         elif action == "decrypt":
             print(decrypt(data, key, encoding=enc))
             sys.exit(0)
+        elif action == "crack":
+            for k, pt, score in crack(data, max_key_size=args.max_key_size):
+                print(f"{k.hex()} {k!r} ({score:.3f}): {pt.decode(enc, errors='replace')}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
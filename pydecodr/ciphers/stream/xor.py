@@ -1,11 +1,25 @@
 """
 pydecodr.ciphers.stream.xor - single-byte xor cipher
+
+crack scores all 256 keys at once: plaintext byte p under key k is the
+ciphertext byte p ^ k, so the byte histogram of the ciphertext times a
+256x256 table built from arange(256) ^ arange(256)[:, None] gives the
+English byte log-likelihood and printable ratio of every key.
 """
 
 from __future__ import annotations
-from typing import Union
+from typing import Union, List, Tuple
 import sys
 import argparse
+import numpy as np
+from pydecodr.utils import scoring
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+_XOR = np.arange(256)[:, None] ^ np.arange(256)[None, :]
+XOR_LOG = scoring.ENGLISH_BYTE_LOG[_XOR]
+XOR_PRINTABLE = scoring.PRINTABLE_MASK[_XOR].astype(np.float64)
+_TABLES = [row.tobytes() for row in _XOR.astype(np.uint8)]
 
 def _parse_key_to_int(key: Union[int, str]) -> int:
     if isinstance(key, int):
@@ -18,7 +32,34 @@ def _parse_key_to_int(key: Union[int, str]) -> int:
     return k
 
 def _xor_single(data: bytes, k: int) -> bytes:
-    return bytes(b ^ k for b in data)
+    return bytes(data).translate(_TABLES[k])
+
+def _as_array(data: Union[str, BytesLike]) -> np.ndarray:
+    if isinstance(data, str):
+        try:
+            data = bytes.fromhex(data)
+        except ValueError as e:
+            raise ValueError('ciphertext must be hex-encoded') from e
+    return np.frombuffer(data, dtype=np.uint8)
+
+def key_scores(data: Union[str, BytesLike]) -> Tuple[np.ndarray, np.ndarray]:
+    """(mean English log-likelihood, printable ratio) of the plaintext under each of the 256 keys."""
+    arr = _as_array(data)
+    if arr.size == 0:
+        return np.zeros(256), np.ones(256)
+    counts = np.bincount(arr, minlength=256).astype(np.float64)
+    return (counts @ XOR_LOG) / arr.size, (counts @ XOR_PRINTABLE) / arr.size
+
+def crack(data: Union[str, BytesLike], limit: int | None = None,
+          min_printable: float = 0.0) -> List[Tuple[int, bytes, float]]:
+    arr = _as_array(data)
+    scores, printable = key_scores(arr)
+    ranked = np.argsort(-scores, kind="stable")
+    if min_printable > 0:
+        ranked = ranked[printable[ranked] >= min_printable]
+    ranked = ranked[:limit].tolist()
+    raw = arr.tobytes()
+    return [(k, _xor_single(raw, k), float(scores[k])) for k in ranked]
 
 def encrypt(plaintext: str, key: Union[int, str], *, encoding: str = "utf-8") -> str:
     k = _parse_key_to_int(key)
@@ -41,9 +82,10 @@ def _build_argparser() -> argparse.ArgumentParser:
         description="XOR"
     )
 
-    p.add_argument("action", choices=["encrypt", "decrypt"], help="action to perform")
-    p.add_argument('data', help="plaintext (encrypt) or hex ciphertext (decrypt)")
-    p.add_argument("key", help="XOR key (string)")
+    p.add_argument("action", choices=["encrypt", "decrypt", "crack"], help="action to perform")
+    p.add_argument('data', help="plaintext (encrypt) or hex ciphertext (decrypt/crack)")
+    p.add_argument("key", nargs="?", default=None, help="XOR key (string), not needed for crack")
+    p.add_argument("--top", type=int, default=5, help="number of keys to show (crack, default: 5)")
     p.add_argument("--encoding", default="utf-8", help="text encoding (default: utf-8)")
 
     return p
@@ -64,6 +106,10 @@ if __name__ == "__main__":
         elif action == "decrypt":
             print(decrypt(data, key, encoding=enc))
             sys.exit(0)
+        elif action == "crack":
+            for k, pt, score in crack(data, limit=args.top):
+                print(f"0x{k:02x} ({score:.3f}): {pt.decode(enc, errors='replace')}")
+            sys.exit(0)
         else:
             parser.print_help()
             sys.exit(1)
@@ -1,15 +1,41 @@
 """
 pydecodr.detectors.autodetect - heuristic detector for encodings
+
+try_decode_candidates runs every cheap decoder against the input and
+ranks the outputs with the shared plaintext scorer. Decoders are gated
+by a structural check on the whole input (alphabet, length) and scored
+on a short aligned sample, only the top results get decoded in full.
 """
 
 from __future__ import annotations
 import base64 
 import re
-from typing import Optional, Dict
+import string
+from functools import partial
+from typing import Optional, Dict, Callable, Iterator, List, Tuple
 from pydecodr.utils.fmt import _printable_ratio
+from pydecodr.utils.scoring import score_text
+from pydecodr.encodings import hex_mod, base64_mod, base32_mod, url_mod
+from pydecodr.ciphers.classical import caesar, atbash
+from pydecodr.ciphers.stream import xor
 import sys
 import argparse
 
+SAMPLE_SIZE = 2048
+XOR_KEYS = 4
+# Caesar and Atbash only move letters, below this share of letters in the
+# sample (random bytes are about a fifth letters) they are not tried
+MIN_LETTER_RATIO = 0.3
+
+_HEX_RE = re.compile(r"[0-9A-Fa-f\s]+")
+_B64_RE = re.compile(r"[A-Za-z0-9+/\s]+={0,2}")
+_B64_URLSAFE_RE = re.compile(r"[A-Za-z0-9_\-\s]+={0,2}")
+_B32_RE = re.compile(r"[A-Za-z2-7\s]+={0,6}")
+_URL_RE = re.compile(r"%[0-9A-Fa-f]{2}")
+_LETTER_RE = re.compile(r"[A-Za-z]")
+
+Candidate = Tuple[str, str, float]
+
 def is_hex(s: str) -> bool:
     return bool(re.fullmatch(r"[0-9A-Fa-f]+", s)) and len(s) % 2 == 0
 
@@ -83,6 +109,92 @@ def detect_type(data: str) -> Dict[str, Optional[str]]:
             "confidence": ratio
         }
     
+def _table(fn: Callable[[str], str]) -> dict:
+    letters = string.ascii_letters
+    return str.maketrans(letters, "".join(fn(ch) for ch in letters))
+
+# built once, the Caesar shifts reuse caesar's own cached tables
+_ATBASH_TABLE = _table(atbash._map_char)
+
+def _translate(table: dict) -> Callable[[str], str]:
+    return lambda s: s.translate(table)
+
+def _xor_hex(key: int) -> Callable[[str], str]:
+    def _decode(s: str) -> str:
+        data = bytes.fromhex("".join(s.split()))
+        return xor._xor_single(data, key).decode("utf-8", "replace")
+    return _decode
+
+def _decoders(text: str) -> Iterator[Tuple[str, Callable[[str], str], int]]:
+    """Yield (scheme, decode, alignment) for every decoder whose structural check passes."""
+    compact = "".join(text.split())
+
+    if len(compact) % 2 == 0 and _HEX_RE.fullmatch(text):
+        yield "hex", hex_mod.decode, 2
+        for k, _, _ in xor.crack(_sample(text, 2), limit=XOR_KEYS):
+            if k:
+                yield f"xor:0x{k:02x}", _xor_hex(k), 2
+
+    if len(compact) % 4 != 1:
+        if _B64_RE.fullmatch(text):
+            yield "base64", base64_mod.decode, 4
+        elif _B64_URLSAFE_RE.fullmatch(text):
+            yield "base64", lambda s: base64_mod.decode(s, urlsafe=True), 4
+
+    if len(compact.rstrip("=")) % 8 not in (1, 3, 6) and _B32_RE.fullmatch(text):
+        yield "base32", base32_mod.decode, 8
+
+    if _URL_RE.search(text):
+        yield "url", url_mod.decode, 1
+
+    sample = _sample(text, 1)
+    if len(_LETTER_RE.findall(sample)) >= max(1, MIN_LETTER_RATIO * len(sample)):
+        yield "rot13", partial(caesar.decrypt, shift=13), 1
+        yield "atbash", _translate(_ATBASH_TABLE), 1
+        for sh in range(1, 26):
+            if sh != 13:
+                yield f"caesar:{sh}", partial(caesar.decrypt, shift=sh), 1
+
+def _sample(text: str, align: int) -> str:
+    if len(text) <= SAMPLE_SIZE:
+        return text
+    if align == 1:
+        return text[:SAMPLE_SIZE]
+    compact = "".join(text[: 2 * SAMPLE_SIZE].split())
+    return compact[: SAMPLE_SIZE - SAMPLE_SIZE % align]
+
+def try_decode_candidates(text: str, limit: int = 5) -> List[Candidate]:
+    data = text.strip()
+    if not data or limit <= 0:
+        return []
+
+    samples: Dict[int, str] = {}
+    scored: List[Tuple[float, int, str, Callable[[str], str]]] = []
+    for order, (name, fn, align) in enumerate(_decoders(data)):
+        sample = samples.get(align)
+        if sample is None:
+            sample = samples[align] = _sample(data, align)
+        try:
+            out = fn(sample)
+        except Exception:
+            continue
+        if not out or out == sample:
+            continue
+        scored.append((score_text(out, sample=SAMPLE_SIZE), order, name, fn))
+
+    scored.sort(key=lambda t: (-t[0], t[1]))
+
+    results: List[Candidate] = []
+    for score, _, name, fn in scored:
+        try:
+            decoded = fn(data)
+        except Exception:
+            continue
+        results.append((name, decoded, score))
+        if len(results) >= limit:
+            break
+    return results
+
 def _build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="pydecodr.detectors.autodetect",
@@ -90,6 +202,7 @@ def _build_argparser() -> argparse.ArgumentParser:
     )
 
     p.add_argument("text", help="string to analyze")
+    p.add_argument("--limit", type=int, default=0, help="rank the top N decodings instead of guessing the type")
 
     return p
 
@@ -100,6 +213,10 @@ if __name__ == "__main__":
     text = args.text
 
     try:
+        if args.limit > 0:
+            for name, decoded, score in try_decode_candidates(text, limit=args.limit):
+                print(f"{score:.2f}  {name:<10} {decoded}")
+            sys.exit(0)
         result = detect_type(text)
         print(f"Detected: {result['type']} (confidence {result['confidence']:.2f})")
         sys.exit(0)
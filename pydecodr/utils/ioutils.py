@@ -7,6 +7,8 @@ that's it either from strings, files, or stdin/stdout.
 
 from __future__ import annotations
 from pathlib import Path
+from typing import Iterator, List, Tuple
+import mmap
 import sys
 
 def read_input(text: str | None = None, infile: str | None = None, binary: bool = False) -> bytes:
@@ -33,4 +35,34 @@ def write_output(data: bytes, outFile: str | None = None, binary: bool = False):
         if binary:
             sys.stdout.buffer.write(data)
         else:
-            print(data.decode('utf-8', 'ignore'))
\ No newline at end of file
+            print(data.decode('utf-8', 'ignore'))
+
+def wordlist_ranges(path: str | Path, parts: int) -> List[Tuple[int, int]]:
+    """Split a wordlist into at most `parts` (start, end) byte ranges that end on a newline."""
+    size = Path(path).stat().st_size
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, max(1, parts)):
+            cut = mm.find(b"\n", max(bounds[-1], size * k // parts))
+            if cut < 0:
+                break
+            if cut + 1 > bounds[-1]:
+                bounds.append(cut + 1)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def iter_wordlist(path: str | Path, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Yield the lines of path[start:end] without their line endings, via mmap."""
+    if Path(path).stat().st_size == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm) if end is None else end
+        mm.seek(start)
+        readline = mm.readline
+        while mm.tell() < end:
+            line = readline().rstrip(b"\r\n")
+            if line:
+                yield line
@@ -0,0 +1,195 @@
+"""
+pydecodr.utils.runner - multi-core restart scheduler for stochastic crackers.
+
+Hill climbing and annealing restarts are independent, so run_restarts fans
+them out over a ProcessPoolExecutor. The read-only quadgram table is put
+in shared memory once and every worker maps it instead of unpickling its
+own copy. Tasks poll stop_requested(), which turns true once any restart
+reaches the target score or the timeout expires.
+
+A task is a module-level function task(seed, *args) -> (score, result).
+run_chunks does the same for exhaustive searches split into chunks (for
+example wordlist byte ranges), task(chunk, *args) -> list of hits.
+"""
+
+from __future__ import annotations
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+from pydecodr.utils import scoring
+
+Result = Tuple[float, Any]
+
+_stop_event = None
+_deadline: Optional[float] = None
+_shm: Optional[shared_memory.SharedMemory] = None
+
+def stop_requested() -> bool:
+    if _stop_event is not None and _stop_event.is_set():
+        return True
+    return _deadline is not None and time.time() > _deadline
+
+def _init_worker(shm_name: Optional[str], stop_event, deadline: Optional[float]) -> None:
+    global _stop_event, _deadline, _shm
+    _stop_event = stop_event
+    _deadline = deadline
+    if shm_name is None:
+        return
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    table = np.ndarray((26 ** 4,), dtype=np.float32, buffer=_shm.buf)
+    table.setflags(write=False)
+    scoring.set_quadgram_table(table)
+
+def _share_table() -> shared_memory.SharedMemory:
+    table = scoring.quadgram_table()
+    shm = shared_memory.SharedMemory(create=True, size=table.nbytes)
+    np.ndarray(table.shape, dtype=table.dtype, buffer=shm.buf)[:] = table
+    return shm
+
+class _Best:
+    def __init__(self, limit: int, key: Optional[Callable[[Any], Hashable]], confirm: int,
+                 confirm_above: Optional[float] = None):
+        self.limit = limit
+        self.key = key or (lambda result: result)
+        self.confirm = confirm
+        self.confirm_above = float("-inf") if confirm_above is None else confirm_above
+        self.found: Dict[Hashable, Result] = {}
+        self.hits: Dict[Hashable, int] = {}
+        self.top = float("-inf")
+
+    def add(self, score: float, result: Any) -> bool:
+        """Record a restart, returns True once the best result has been confirmed."""
+        k = self.key(result)
+        if k not in self.found or score > self.found[k][0]:
+            self.found[k] = (score, result)
+        self.hits[k] = self.hits.get(k, 0) + 1
+        self.top = max(self.top, score)
+        return (bool(self.confirm) and self.hits[k] >= self.confirm and score >= self.top
+                and score >= self.confirm_above)
+
+    def ranked(self) -> List[Result]:
+        return sorted(self.found.values(), key=lambda r: -r[0])[: self.limit]
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+def run_restarts(task: Callable[..., Result], restarts: int, args: Sequence[Any] = (), *,
+                 workers: Optional[int] = 1, limit: int = 5, target: Optional[float] = None,
+                 timeout: Optional[float] = None, confirm: int = 0, seed: int = 0,
+                 key: Optional[Callable[[Any], Hashable]] = None,
+                 confirm_above: Optional[float] = None) -> List[Result]:
+    """
+    Run task(seed + r, *args) for r in range(restarts) and merge the best results.
+
+    workers=None uses every core, workers=1 runs in this process. Stops early
+    when a score reaches target, when `confirm` restarts agree on the best
+    result (compared with key), or after timeout seconds. With confirm_above
+    only a result scoring at least that much counts as confirmed.
+    """
+    global _stop_event, _deadline
+    best = _Best(limit, key, confirm, confirm_above)
+    deadline = time.time() + timeout if timeout else None
+    workers = default_workers() if workers is None else max(1, workers)
+
+    if workers == 1 or restarts <= 1:
+        _stop_event, _deadline = None, deadline
+        try:
+            for r in range(restarts):
+                score, result = task(seed + r, *args)
+                done = best.add(score, result)
+                if done or (target is not None and score >= target) or stop_requested():
+                    break
+        finally:
+            _deadline = None
+        return best.ranked()
+
+    ctx = mp.get_context()
+    stop = ctx.Event()
+    shm = _share_table()
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, restarts), mp_context=ctx,
+                                 initializer=_init_worker, initargs=(shm.name, stop, deadline)) as pool:
+            pending = {pool.submit(task, seed + r, *args) for r in range(restarts)}
+            while pending:
+                wait_for = None if deadline is None else max(0.0, deadline - time.time())
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                finished = False
+                for fut in done:
+                    if fut.cancelled():
+                        continue
+                    score, result = fut.result()
+                    finished |= best.add(score, result)
+                    finished |= target is not None and score >= target
+                if finished or (deadline is not None and time.time() >= deadline):
+                    stop.set()
+                    for fut in pending:
+                        fut.cancel()
+                    for fut in wait(pending).done:
+                        if not fut.cancelled():
+                            best.add(*fut.result())
+                    break
+    finally:
+        shm.close()
+        shm.unlink()
+    return best.ranked()
+
+def run_chunks(task: Callable[..., List[Any]], chunks: Sequence[Any], args: Sequence[Any] = (), *,
+               workers: Optional[int] = 1, first: bool = False, timeout: Optional[float] = None,
+               progress: Optional[Callable[[int, int], None]] = None,
+               until: Optional[Callable[[List[Any]], bool]] = None) -> List[Any]:
+    """
+    Run task(chunk, *args) for every chunk and concatenate the returned hits.
+
+    first=True stops as soon as any chunk reports a hit, until(hits) stops
+    once it returns True, timeout stops after that many seconds. Tasks
+    should poll stop_requested().
+    progress(done, total) is called after every finished chunk.
+    """
+    global _stop_event, _deadline
+    hits: List[Any] = []
+
+    def finished() -> bool:
+        return (first and bool(hits)) or (until is not None and until(hits))
+
+    deadline = time.time() + timeout if timeout else None
+    workers = default_workers() if workers is None else max(1, workers)
+
+    if workers == 1 or len(chunks) <= 1:
+        _stop_event, _deadline = None, deadline
+        try:
+            for n, chunk in enumerate(chunks, 1):
+                hits.extend(task(chunk, *args))
+                if progress:
+                    progress(n, len(chunks))
+                if finished() or stop_requested():
+                    break
+        finally:
+            _deadline = None
+        return hits
+
+    ctx = mp.get_context()
+    stop = ctx.Event()
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=ctx,
+                             initializer=_init_worker, initargs=(None, stop, deadline)) as pool:
+        pending = {pool.submit(task, chunk, *args) for chunk in chunks}
+        while pending:
+            wait_for = None if deadline is None else max(0.0, deadline - time.time())
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if not fut.cancelled():
+                    hits.extend(fut.result())
+            if progress and done:
+                progress(len(chunks) - len(pending), len(chunks))
+            if finished() or (deadline is not None and time.time() >= deadline):
+                stop.set()
+                for fut in pending:
+                    fut.cancel()
+                for fut in wait(pending).done:
+                    if not fut.cancelled():
+                        hits.extend(fut.result())
+                break
+    return hits
@@ -0,0 +1,257 @@
+"""
+pydecodr.utils.scoring - plaintext scoring helpers.
+
+Shared scorers used by the detectors and the crack routines to rank
+candidate plaintexts. Higher scores always mean "more like English".
+
+Quadgram log10-probabilities live in a flat 26^4 float32 table indexed by
+((a*26 + b)*26 + c)*26 + d, so scoring a letter stream is a handful of
+vectorised ops. quadgram_scores() scores a whole (rows, N) batch of
+candidate texts in one call, that is the form brute forces should use.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+
+QUADGRAM_FILE = Path(__file__).parent / "data" / "english_quadgrams.txt"
+
+ENGLISH_FREQ = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+], dtype=np.float64)
+ENGLISH_FREQ /= ENGLISH_FREQ.sum()
+ENGLISH_LOG_FREQ = np.log(ENGLISH_FREQ)
+ENGLISH_ENTROPY = float(-(ENGLISH_FREQ * ENGLISH_LOG_FREQ).sum())
+
+PRINTABLE_MASK = np.zeros(256, dtype=bool)
+PRINTABLE_MASK[32:127] = True
+PRINTABLE_MASK[[9, 10, 13]] = True
+
+def _english_byte_log() -> np.ndarray:
+    probs = np.full(256, 1e-6)
+    probs[32:127] = 1e-4
+    probs[97:123] = 0.76 * ENGLISH_FREQ
+    probs[65:91] = 0.04 * ENGLISH_FREQ
+    probs[32] = 0.15
+    probs[[ord(c) for c in ".,'\"-!?:;()"]] = 2e-3
+    probs[48:58] = 1e-3
+    probs[[9, 10, 13]] = 2e-3
+    return np.log(probs / probs.sum())
+
+ENGLISH_BYTE_LOG = _english_byte_log()
+
+LETTER_INDEX = np.full(256, 255, dtype=np.uint8)
+LETTER_INDEX[65:91] = np.arange(26)
+LETTER_INDEX[97:123] = np.arange(26)
+
+def _to_array(data: str | bytes) -> np.ndarray:
+    if isinstance(data, str):
+        data = data.encode("utf-8", "replace")
+    return np.frombuffer(data, dtype=np.uint8)
+
+def byte_counts(data: str | bytes) -> np.ndarray:
+    return np.bincount(_to_array(data), minlength=256)
+
+def letter_counts(data: str | bytes) -> np.ndarray:
+    counts = byte_counts(data)
+    return counts[65:91] + counts[97:123]
+
+def printable_ratio(data: str | bytes) -> float:
+    arr = _to_array(data)
+    if arr.size == 0:
+        return 1.0
+    return float(np.count_nonzero(PRINTABLE_MASK[arr])) / arr.size
+
+def letter_indices(data: str | bytes) -> np.ndarray:
+    idx = LETTER_INDEX[_to_array(data)]
+    return idx[idx < 26]
+
+_QUADGRAMS: Optional[np.ndarray] = None
+
+def _backoff(counts: np.ndarray, total: float) -> np.ndarray:
+    """
+    Probabilities for quadgrams missing from the table: P(abc) * P(d | c),
+    with P(abc) itself chained from bigrams when abc is missing too. Both
+    steps are discounted, so a missing gram never beats a seen one much.
+    """
+    c4 = counts.reshape(26, 26, 26, 26)
+    c3 = c4.sum(axis=3)
+    c2 = c3.sum(axis=2)
+    c1 = c2.sum(axis=1)
+    p2 = c2 / c2.sum()
+    p1 = np.maximum(c1 / c1.sum(), 1e-12)
+    follow = p2 / p1[:, None]  # P(b | a)
+    p3 = np.where(c3 > 0, c3 / total, _BACKOFF * p2[:, :, None] * follow[None, :, :])
+    return (_BACKOFF * p3[..., None] * follow[None, None, :, :]).ravel()
+
+# discount per backoff step
+_BACKOFF = 0.3
+
+def _load_quadgrams() -> np.ndarray:
+    counts = {}
+    with open(QUADGRAM_FILE, "r", encoding="ascii") as f:
+        for line in f:
+            gram, count = line.split()
+            counts[gram] = int(count)
+
+    total = float(sum(counts.values()))
+    seen = np.zeros(26 ** 4, dtype=np.float64)
+    grams = np.frombuffer("".join(counts).encode("ascii"), dtype=np.uint8).reshape(-1, 4) - 65
+    seen[_quadgram_index(grams).ravel()] = np.fromiter(counts.values(), dtype=np.float64)
+    # the table only lists the commonest quadgrams, a flat floor for the
+    # rest makes every unlisted gram equally bad and the key searches blind
+    probs = np.where(seen > 0, seen / total, _backoff(seen, total))
+    table = np.log10(np.maximum(probs, 0.01 / total)).astype(np.float32)
+    table.setflags(write=False)
+    return table
+
+def quadgram_table() -> np.ndarray:
+    global _QUADGRAMS
+    if _QUADGRAMS is None:
+        _QUADGRAMS = _load_quadgrams()
+    return _QUADGRAMS
+
+def set_quadgram_table(table: np.ndarray) -> None:
+    """Install an already built table, e.g. one attached from shared memory by a worker."""
+    global _QUADGRAMS
+    if table.shape != (26 ** 4,):
+        raise ValueError("quadgram table must have 26^4 entries")
+    _QUADGRAMS = table
+    quadgram_stats.cache_clear()
+
+@lru_cache(maxsize=None)
+def quadgram_stats() -> tuple[float, float]:
+    """(mean log10 prob of English text, floor value) used to normalise scores."""
+    table = quadgram_table()
+    probs = 10.0 ** table.astype(np.float64)
+    seen = table > table.min()
+    english = float((probs[seen] * table[seen]).sum() / probs[seen].sum())
+    return english, float(table.min())
+
+def _quadgram_index(idx: np.ndarray) -> np.ndarray:
+    a = idx.astype(np.int32)
+    return ((a[..., :-3] * 26 + a[..., 1:-2]) * 26 + a[..., 2:-1]) * 26 + a[..., 3:]
+
+def quadgram_score(data: Union[str, bytes, np.ndarray]) -> float:
+    idx = data if isinstance(data, np.ndarray) else letter_indices(data)
+    if idx.size < 4:
+        return 0.0
+    return float(quadgram_table()[_quadgram_index(idx)].sum(dtype=np.float64))
+
+def quadgram_scores(rows: np.ndarray) -> np.ndarray:
+    """Total quadgram log-probability of every row of a (R, N) letter-index matrix."""
+    if rows.shape[-1] < 4:
+        return np.zeros(rows.shape[:-1], dtype=np.float64)
+    return quadgram_table()[_quadgram_index(rows)].sum(axis=-1, dtype=np.float64)
+
+def quadgram_fitness(data: Union[str, bytes, np.ndarray]) -> float:
+    idx = data if isinstance(data, np.ndarray) else letter_indices(data)
+    if idx.size < 4:
+        return 0.0
+    english, floor = quadgram_stats()
+    mean = quadgram_score(idx) / (idx.size - 3)
+    return float(min(1.0, max(0.0, (mean - floor) / (english - floor))))
+
+def row_letter_counts(rows: np.ndarray) -> np.ndarray:
+    """Letter histogram of every row of a (R, N) letter-index matrix, shape (R, 26)."""
+    r = rows.shape[0]
+    offsets = (np.arange(r, dtype=np.intp) * 26)[:, None]
+    return np.bincount((rows + offsets).ravel(), minlength=26 * r).reshape(r, 26)
+
+def chi_squared(counts: np.ndarray) -> float | np.ndarray:
+    """Chi-squared distance from English of a (26,) histogram or of each row of a (R, 26) one."""
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.sum(axis=-1, keepdims=True)
+    expected = ENGLISH_FREQ * n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi = np.where(n[..., 0] > 0, (((counts - expected) ** 2) / expected).sum(axis=-1), np.inf)
+    return float(chi) if chi.ndim == 0 else chi
+
+def score_text(text: str | bytes, sample: int = 4096) -> float:
+    counts = byte_counts(text[:sample])
+    n = counts.sum()
+    if n == 0:
+        return 0.0
+
+    printable = counts[PRINTABLE_MASK].sum() / n
+    letters = counts[65:91] + counts[97:123]
+    nl = letters.sum()
+    if nl == 0:
+        return float(0.1 * printable)
+
+    if nl >= 8:
+        fit = quadgram_fitness(text[:sample])
+    else:
+        # mean letter log-likelihood against the entropy of English: ~1.0
+        # for English, much lower for shifted or random letters
+        fit = min(1.0, np.exp((letters @ ENGLISH_LOG_FREQ) / nl + ENGLISH_ENTROPY))
+    textlike = (nl + counts[32]) / n
+    return float(printable * (0.6 * fit + 0.4 * textlike))
+
+class IncrementalFitness:
+    """
+    Quadgram fitness of key[cipher] for swap-based key searches.
+
+    key maps a ciphertext letter index to a plaintext letter index. The
+    ciphertext quadgrams are collapsed into distinct grams with counts and
+    each gram keeps its current contribution, plus an index of which grams
+    contain each ciphertext letter. swap() rescores only the grams holding
+    one of the two swapped letters and revert() restores the saved ones.
+    """
+
+    __slots__ = ("key", "score", "_grams", "_counts", "_contrib", "_by_letter", "_has_letter", "_undo")
+
+    _WEIGHTS = np.array([26 ** 3, 26 ** 2, 26, 1], dtype=np.int32)
+
+    def __init__(self, cipher: np.ndarray, key: np.ndarray):
+        cipher = np.asarray(cipher, dtype=np.uint8)
+        if cipher.size >= 4:
+            grams, counts = np.unique(_quadgram_index(cipher), return_counts=True)
+        else:
+            grams, counts = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+        self._grams = np.stack([(grams // w) % 26 for w in self._WEIGHTS], axis=1).astype(np.intp)
+        self._counts = counts.astype(np.float64)
+        self._has_letter = np.zeros((26, grams.size), dtype=bool)
+        for j in range(4):
+            self._has_letter[self._grams[:, j], np.arange(grams.size)] = True
+        self._by_letter = [np.flatnonzero(row) for row in self._has_letter]
+        self.set_key(key)
+
+    def _rescore(self, rows: np.ndarray) -> np.ndarray:
+        plain = self.key[self._grams[rows]].astype(np.int32)
+        return quadgram_table()[plain @ self._WEIGHTS] * self._counts[rows]
+
+    def set_key(self, key: np.ndarray) -> float:
+        self.key = np.array(key, dtype=np.uint8)
+        self._contrib = self._rescore(np.arange(self._counts.size))
+        self.score = float(self._contrib.sum())
+        self._undo = None
+        return self.score
+
+    def swap(self, a: int, b: int) -> float:
+        """Swap key[a] and key[b] and return the new total score."""
+        self.key[[a, b]] = self.key[[b, a]]
+        rows_b = self._by_letter[b]
+        rows = np.concatenate((self._by_letter[a], rows_b[~self._has_letter[a, rows_b]]))
+        old = self._contrib[rows]
+        new = self._rescore(rows)
+        self._contrib[rows] = new
+        self._undo = (a, b, rows, old, self.score)
+        self.score += float(new.sum() - old.sum())
+        return self.score
+
+    def revert(self) -> float:
+        """Undo the last swap() and return the restored score."""
+        if self._undo is None:
+            raise RuntimeError("nothing to revert")
+        a, b, rows, old, score = self._undo
+        self.key[[a, b]] = self.key[[b, a]]
+        self._contrib[rows] = old
+        self.score = score
+        self._undo = None
+        return self.score
@@ -0,0 +1,109 @@
+"""
+pydecodr.utils.squares - simulated annealing over 5x5 Polybius squares.
+
+A square is a 25-entry key array (cell -> letter index). Playfair and
+bifid search squares the same way and only differ in how a batch of
+keys is scored, so a cipher supplies score(keys) -> scores for an
+(R, 25) key matrix and anneal() does the rest.
+
+Moves are cell permutations applied as key[move]. They are proposed
+from the current key in batches; the first one accepted ends the batch,
+so the chain is the same as one move at a time while rejected moves
+(nearly all of them) cost a fraction.
+"""
+
+from __future__ import annotations
+from typing import Callable, Tuple
+import numpy as np
+from pydecodr.utils import runner, scoring
+
+Scorer = Callable[[np.ndarray], np.ndarray]
+
+CELLS = np.arange(25, dtype=np.intp)
+
+BATCH = 64
+
+# a solved square reads as English, allowing this much per quadgram for
+# short texts, padding letters and rare words
+TARGET_MARGIN = 0.5
+
+# a square reaching the target on a short text is often a few moves short
+# of the optimum, so the chain runs this many more moves at half the
+# temperature before the polish
+SETTLE = 20000
+
+def move_table(flips: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Letter swaps, row swaps and column swaps (plus flips and reversal
+    with flips=True) as cell permutations, with cumulative odds.
+    """
+    grid = CELLS.reshape(5, 5)
+    swaps, others = [], []
+    for a in range(25):
+        for b in range(a + 1, 25):
+            perm = CELLS.copy()
+            perm[[a, b]] = perm[[b, a]]
+            swaps.append(perm)
+    for a in range(5):
+        for b in range(a + 1, 5):
+            perm = grid.copy()
+            perm[[a, b]] = perm[[b, a]]
+            others.append(perm.ravel())
+            perm = grid.copy()
+            perm[:, [a, b]] = perm[:, [b, a]]
+            others.append(perm.ravel())
+    if flips:
+        others += [grid[::-1].ravel(), grid[:, ::-1].ravel(), CELLS[::-1]]
+
+    # letter swaps 90% of the time, the square-wide moves share the rest
+    weights = np.concatenate((np.full(len(swaps), 0.9 / len(swaps)), np.full(len(others), 0.1 / len(others))))
+    return np.array(swaps + others, dtype=np.intp), np.cumsum(weights) / weights.sum()
+
+def default_target(letters: int) -> float:
+    """Early-stop score for a plaintext of this many letters."""
+    english, _ = scoring.quadgram_stats()
+    return (letters - 3) * (english - TARGET_MARGIN)
+
+def polish(key: np.ndarray, score: float, scores: Scorer, moves: np.ndarray) -> Tuple[float, np.ndarray]:
+    """Steepest ascent over every move at once until none improves."""
+    while True:
+        cands = key[moves]
+        values = scores(cands)
+        j = int(values.argmax())
+        if values[j] <= score:
+            return score, key
+        key, score = cands[j], float(values[j])
+
+def anneal(rng: np.random.Generator, scores: Scorer, moves: np.ndarray, cdf: np.ndarray, iterations: int,
+           temperature: float, target: float) -> Tuple[float, np.ndarray]:
+    """
+    Anneal from a random square at a fixed temperature, returns the best
+    (score, key) after a final polish(). Settles for SETTLE more moves once
+    target is reached, stops early on runner.stop_requested().
+    """
+    key = rng.permutation(25)
+    current = float(scores(key[None])[0])
+    best_score, best_key = current, key
+
+    i, batch, settling = 0, BATCH, False
+    while i < iterations and not runner.stop_requested():
+        cands = key[moves[np.searchsorted(cdf, rng.random(batch))]]
+        values = scores(cands)
+        delta = np.minimum(values - current, 0.0)
+        ok = rng.random(batch) < np.exp(delta / temperature)
+        j = int(ok.argmax())
+        if not ok[j]:
+            i += batch
+            batch = min(BATCH, 2 * batch)
+            continue
+        i += j + 1
+        batch = max(4, min(BATCH, 2 * (j + 1)))
+        key, current = cands[j], float(values[j])
+        if current > best_score:
+            best_score, best_key = current, key
+            if best_score >= target and not settling:
+                settling = True
+                temperature /= 2
+                iterations = min(iterations, i + SETTLE)
+    # a near miss is often a move or two away from the optimum
+    return polish(best_key, best_score, scores, moves)
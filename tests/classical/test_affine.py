@@ -7,3 +7,10 @@ def test_affine():
     assert affine.decrypt(ct, a, b) == text
 
 
+def test_affine_crack():
+    pt = "Meet me by the old mill at midnight"
+    ct = affine.encrypt(pt, 7, 3)
+    best = affine.crack(ct, limit=1)[0]
+    assert best[:3] == (7, 3, pt)
+    assert affine.solve_known("meet", ct) == (7, 3)
+    assert affine.crack(ct, known_plaintext="MEET")[0][2] == pt
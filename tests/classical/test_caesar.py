@@ -5,3 +5,11 @@ def test_caesar():
     key = 5
     ct = caesar.encrypt(text, key)
     assert caesar.decrypt(ct, key) == text
+
+def test_caesar_crack():
+    ct = caesar.encrypt("Attack at dawn, hold the bridge!", 11)
+    ranked = caesar.crack(ct)
+    assert len(ranked) == 26
+    assert ranked[0][:2] == (11, "Attack at dawn, hold the bridge!")
+    assert ranked[0][2] >= ranked[1][2]
+    assert caesar.crack(ct, method="chi2", limit=1)[0][0] == 11
@@ -1,3 +1,4 @@
+import pytest
 from pydecodr.ciphers.classical import hill
 
 def test_hill():
@@ -7,4 +8,28 @@ def test_hill():
     rt = hill.decrypt(ct, key)
 
     expected = pt.upper()
-    assert rt == expected
\ No newline at end of file
+    assert rt == expected
+
+
+def test_hill_crack(pride):
+    pt = hill.clean_letters(pride)
+    ct = hill.encrypt(pt, "3,3,2,5")
+    assert hill.crack(ct, known_plaintext=pt[:8])[0][0] == "3,3,2,5"
+    with pytest.raises(ValueError, match="does not match"):
+        hill.solve_known("ITWAZZZZZZZZZZZZ", ct)
+    key, rt, _ = hill.crack(ct)[0]
+    assert (key, rt) == ("3,3,2,5", pt[:len(rt)])
+
+    key3 = "6,24,1,13,16,10,20,17,15"
+    ct3 = hill.encrypt(pt[:150], key3)
+    assert hill.crack(ct3, n=3, known_plaintext=pt[:30])[0][0] == key3
+    assert hill.crack(ct3, n=3)[0][0] == key3
+
+def test_hill_nxn(pride):
+    key = "12,1,7,1,17,4,9,13,4,17,3,18,9,17,21,5"
+    inv = hill.mat_inv(hill.parse_matrix(key)[0])
+    assert hill.mat_inv(inv) == hill.parse_matrix(key)[0]
+    pt = hill.clean_letters(pride)
+    ct = hill.encrypt(pt, key)
+    assert len(ct) % 4 == 0 and hill.decrypt(ct, key)[:len(pt)] == pt
+    assert hill.encrypt("ATTACKATDAWN", "3,3;2,5") == hill.encrypt("ATTACKATDAWN", "3,3,2,5")
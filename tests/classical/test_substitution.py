@@ -1,7 +1,21 @@
 from pydecodr.ciphers.classical import substitution
+from pydecodr.utils import scoring
 
 def test_substitution():
     text = "AVADAKEDAVRA"
     mapping ={chr(i+65): chr(i+65) for i in range(26)}
     ct = substitution.encrypt(text, mapping)
-    assert substitution.decrypt(ct, mapping) == text
\ No newline at end of file
+    assert substitution.decrypt(ct, mapping) == text
+
+def test_substitution_crack(pride):
+    ct = substitution.encrypt(pride, "QWERTYUIOPASDFGHJKLZXCVBNM")
+    key, rt, score = substitution.crack(ct, seed=1)[0]
+    # the only x ("fixed") scores no better than a z there
+    assert rt.replace("fized", "fixed") == pride
+    assert score >= scoring.quadgram_score(pride)
+
+def test_substitution_crack_seeds(dickens):
+    for key, seed in (("ZEBRASCDFGHIJKLMNOPQTUVWXY", 2), ("MNBVCXZLKJHGFDSAPOIUYTREWQ", 3),
+                      ("QWERTYUIOPASDFGHJKLZXCVBNM", 4)):
+        ct = substitution.encrypt(dickens, key)
+        assert substitution.crack(ct, seed=seed)[0][1] == dickens
@@ -0,0 +1,21 @@
+import pytest
+
+PRIDE = ("It is a truth universally acknowledged, that a single man in possession of a good fortune, "
+         "must be in want of a wife. However little known the feelings or views of such a man may be "
+         "on his first entering a neighbourhood, this truth is so well fixed in the minds of the "
+         "surrounding families, that he is considered the rightful property of some one or other "
+         "of their daughters.")
+
+DICKENS = ("It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+           "foolishness, it was the epoch of belief, it was the epoch of incredulity, it was the season of Light, "
+           "it was the season of Darkness, it was the spring of hope, it was the winter of despair, we had "
+           "everything before us, we had nothing before us, we were all going direct to Heaven, we were all "
+           "going direct the other way.")
+
+@pytest.fixture
+def pride():
+    return PRIDE
+
+@pytest.fixture
+def dickens():
+    return DICKENS
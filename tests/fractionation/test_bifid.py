@@ -9,4 +9,33 @@ def test_bidid():
 
     expected = "".join(("I" if c.upper() == "J" else c.upper()) if c.isalpha() else c for c in pt)
 
-    assert rt == expected
\ No newline at end of file
+    assert rt == expected
+
+def test_bifid_whole_message(pride):
+    ct = bifid.encrypt(pride, key="FORTIFICATION", period=0)
+    assert ct == bifid.encrypt(pride, key="FORTIFICATION", period=len(pride))
+    assert bifid.decrypt(ct, key="FORTIFICATION", period=0) == pride.upper()
+
+def test_bifid_crack(pride):
+    ct = bifid.encrypt(pride, key="FORTIFICATION", period=7)
+    assert bifid.estimate_period(ct)[0][0] == 7
+    key, period, rt, _ = bifid.crack(ct, seed=1)[0]
+    assert (period, rt) == (7, pride.upper())
+    assert bifid.encrypt(rt, key=key, period=period) == ct.upper()
+
+def test_bifid_odd_period(pride, monkeypatch):
+    ct = bifid.encrypt(pride, key="ZEBRASTRIPE", period=5)
+    assert 5 in [p for p, _ in bifid.estimate_period(ct)[:4]]
+
+    # the candidate periods share one run, so the timeout covers all of them
+    calls = []
+    monkeypatch.setattr(bifid.runner, "run_restarts", lambda *args, **kwargs: calls.append((args, kwargs)) or [])
+    assert bifid.crack(ct, restarts=3, timeout=2) == []
+    [(args, kwargs)] = calls
+    assert args[1] == 3 * 4 and kwargs["timeout"] == 2
+
+def test_bifid_crack_seeds(dickens):
+    ct = bifid.encrypt(dickens, key="QUEEN ANNE", period=6)
+    for seed in (2, 3, 4):
+        key, period, rt, _ = bifid.crack(ct, seed=seed)[0]
+        assert (period, rt) == (6, dickens.upper())
@@ -1,4 +1,6 @@
 import base64
+import hashlib
+import pytest
 from pydecodr.ciphers.modern import aes
 
 def test_aes(monkeypatch):
@@ -11,4 +13,37 @@ def test_aes(monkeypatch):
     blob = base64.b64decode(ct_b64)
     assert blob[:16] == b"\x00" * 16
     assert (len(blob) - 16) % 16 == 0
-    
\ No newline at end of file
+    
+def test_aes_modes_and_streaming(tmp_path):
+    key = bytes(range(32))
+    data = bytes(range(256)) * 5
+    for mode in aes.MODES:
+        blob = aes.encrypt_bytes(data, key, mode)
+        assert aes.decrypt_bytes(memoryview(blob), key, mode) == data
+
+        enc = aes.encryptor(key, mode, iv=blob[:aes.HEADER_SIZE[mode]])
+        chunks = [enc.update(data[i:i + 100]) for i in range(0, len(data), 100)]
+        assert b"".join(chunks) + enc.finalize() == blob
+
+        src, ct, out = tmp_path / "pt.bin", tmp_path / "ct.bin", tmp_path / "out.bin"
+        src.write_bytes(data)
+        aes.encrypt_file(src, ct, key, mode, chunk_size=64)
+        aes.decrypt_file(ct, out, key, mode, chunk_size=48)
+        assert out.read_bytes() == data
+
+    tampered = bytearray(aes.encrypt_bytes(data, key, "GCM"))
+    tampered[40] ^= 1
+    with pytest.raises(ValueError):
+        aes.decrypt_bytes(tampered, key, "GCM")
+
+def test_aes_crack(tmp_path):
+    words = tmp_path / "words.txt"
+    words.write_bytes(b"".join(b"password%d\n" % i for i in range(300)) + b"hunter2\n")
+    ct = aes.encrypt("attack at dawn", hashlib.sha256(b"hunter2").digest())
+    word, key, pt, _ = aes.crack(ct, words, kdf="sha256")[0]
+    assert (word, pt) == (b"hunter2", b"attack at dawn")
+
+    ticks = []
+    ct = aes.encrypt("attack at dawn", "hex:" + hashlib.md5(b"hunter2").hexdigest())
+    best = aes.crack(ct, words, kdf="md5", workers=2, progress=lambda done, total: ticks.append((done, total)))
+    assert best[0][0] == b"hunter2" and ticks[-1][0] == ticks[-1][1]
@@ -1,3 +1,4 @@
+import pytest
 import hashlib
 from pydecodr.ciphers.modern import hashes
 
@@ -13,4 +14,47 @@ def test_hashes():
         expected = getattr(hashlib, algo)(s.encode()).hexdigest()
         got = hashes.hash_text(s, algo)
         assert got.lower() == expected, f"{algo} mismatch"
-        assert hashes.verify_hash(s, expected, algo), f"{algo} verify failed"
\ No newline at end of file
+        assert hashes.verify_hash(s, expected, algo), f"{algo} verify failed"
+
+
+def test_hashes_crack(tmp_path):
+    words = tmp_path / "words.txt"
+    words.write_bytes(b"".join(b"word%d\n" % i for i in range(1000)) + b"hunter\r\nletmein\n")
+    targets = [hashlib.sha1(w).hexdigest() for w in (b"hunter", b"word7", b"L37m31n42")]
+    found, count, rate = hashes.crack(targets, words, "sha1")
+    assert found == {targets[0]: b"hunter", targets[1]: b"word7"}
+    assert count == 1002 and rate > 0
+
+    found, _, _ = hashes.crack(targets[2], words, "sha1", rules=["case", "leet", "digits"], workers=2)
+    assert found == {targets[2]: b"L37m31n42"}
+
+    fruit = tmp_path / "fruit.txt"
+    fruit.write_bytes(b"apple\napple\nbanana\n")
+    wanted = [hashlib.md5(w).hexdigest() for w in (b"apple", b"banana")]
+    assert len(hashes.crack(wanted, fruit, workers=2)[0]) == 2
+    with pytest.raises(ValueError):
+        hashes.crack(targets, words, "shake_128")
+
+def test_hashes_identify(monkeypatch):
+    assert hashes.identify(hashlib.md5(b"x").hexdigest())[0] == "md5"
+    assert hashes.identify(hashlib.sha256(b"x").hexdigest())[0] == "sha256"
+    assert "sha1" in hashes.identify(hashlib.sha1(b"x").hexdigest().upper())
+    assert hashes.identify("$6$salt$hash") == ["sha512crypt"]
+    assert hashes.identify("not a digest") == []
+
+    monkeypatch.setattr(hashes, "_digest_sizes", lambda: {16: ["md5", "md4"]})
+    assert hashes.identify(hashlib.md5(b"x").hexdigest()) == ["md5", "md4", "ntlm"]
+
+def test_hashes_index(tmp_path):
+    words = [b"word%d" % i for i in range(2000)] + [b"hunter2", b"word5"]
+    wordlist = tmp_path / "words.txt"
+    wordlist.write_bytes(b"\n".join(words) + b"\n")
+    index_path = tmp_path / "words.idx"
+    assert hashes.build_index(wordlist, index_path, "md5") == 2001
+    with pytest.raises(ValueError):
+        hashes.build_index(wordlist, tmp_path / "shake.idx", "shake_256")
+    with hashes.HashIndex(index_path) as index:
+        assert index.algo == "md5" and len(index) == 2001
+        for word in (b"hunter2", b"word0", b"word1999"):
+            assert index.lookup(hashlib.md5(word).hexdigest()) == word
+        assert index.lookup(hashlib.md5(b"missing").digest()) is None
@@ -0,0 +1,19 @@
+import base64
+from pydecodr.ciphers.modern import aes, padding_oracle
+
+def test_padding_oracle_attack():
+    key = "1234567890abcdef"
+    oracle = padding_oracle.local_oracle(key)
+    for pt in ["", "HACKCLUB", "exactly16bytes!!", "padding oracles leak the whole plaintext"]:
+        recovered, queries, seconds = padding_oracle.attack(aes.encrypt(pt, key), oracle, threads=4)
+        assert recovered == pt.encode()
+        assert queries > 0 and seconds >= 0
+
+def test_padding_oracle_cache():
+    key = "1234567890abcdef"
+    engine = padding_oracle.PaddingOracleAttack(padding_oracle.local_oracle(key), threads=1)
+    blob = base64.b64decode(aes.encrypt("cached answers", key))
+    assert engine.decrypt(blob) == b"cached answers"
+    queries = engine.queries
+    assert engine.decrypt(blob) == b"cached answers"
+    assert engine.queries == queries and engine.cache_hits >= queries
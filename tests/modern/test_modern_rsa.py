@@ -1,4 +1,6 @@
-from pydecodr.ciphers.modern import rsa
+import time
+import pytest
+from pydecodr.ciphers.modern import rsa, rsa_attacks
 
 def test_rsa():
     pub, priv = rsa._generate_keys(61, 53, 65537)
@@ -9,3 +11,91 @@ def test_rsa():
     pt = "HACKCLUB"
     ct = rsa.encrypt(pt, n, e)
     assert rsa.decrypt(ct, n, d) == pt
+
+def test_rsa_blocks():
+    p, q = 1000000007, 998244353
+    (n, e), (_, d) = rsa._generate_keys(p, q, 65537)
+    data = b"\x00blockwise RSA packs several bytes into every modexp"
+    ct = rsa.encrypt_bytes(data, n, e)
+    assert len(ct) == 8 * (len(data) // rsa.max_block_size(n) + 1)
+    assert rsa.decrypt_bytes(ct, n, d) == data
+    for tail in (b"\x00", b"\x00\x00\x01", bytes(7), b""):
+        assert rsa.decrypt_bytes(rsa.encrypt_bytes(tail, n, e), n, d) == tail
+        assert rsa.decrypt_bytes(rsa.encrypt_bytes(data + tail, n, e), n, d) == data + tail
+    assert rsa.decrypt_many([ct, ct], n, d, p=p, q=q) == [data, data]
+
+def test_rsa_padding():
+    from Crypto.Cipher import PKCS1_OAEP
+    from Crypto.PublicKey import RSA
+    from Crypto.Util.number import getPrime
+    p, q = getPrime(512), getPrime(512)
+    n, e = p * q, 65537
+    d = pow(e, -1, (p - 1) * (q - 1))
+    data = b"framed " * 40
+    for padding in ("pkcs1", "oaep"):
+        ct = rsa.encrypt_bytes(data, n, e, padding=padding)
+        assert ct != rsa.encrypt_bytes(data, n, e, padding=padding)
+        assert rsa.decrypt_bytes(ct, n, d, p=p, q=q, padding=padding) == data
+    theirs = PKCS1_OAEP.new(RSA.construct((n, e))).encrypt(b"interop")
+    assert rsa.decrypt_bytes(theirs, n, d, padding="oaep") == b"interop"
+
+def test_rsa_is_prime():
+    assert [x for x in range(30) if rsa.is_prime(x)] == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert rsa.is_prime(2 ** 127 - 1)
+    assert not rsa.is_prime(561) and not rsa.is_prime((2 ** 61 - 1) * (2 ** 31 - 1))
+
+def test_rsa_attack():
+    from Crypto.Util.number import getPrime
+    m = int.from_bytes(b"weak keys", "big")
+
+    p = getPrime(256)
+    q = p + 2
+    while not rsa.is_prime(q):
+        q += 2
+    [r] = rsa.attack((p * q, 65537, pow(m, 65537, p * q)), timeout=5)
+    assert (r.attack, r.p, r.q, r.m) == ("fermat", p, q, m)
+    strong = getPrime(512) * getPrime(512)
+    [r] = rsa.attack([(strong, 65537, None), (p * q, 65537, pow(m, 65537, p * q))], timeout=3)
+    assert (r.attack, r.targets, r.m) == ("fermat", (1,), m)
+
+    # the hard modulus gets its slice, not the whole timeout
+    weak = getPrime(32) * getPrime(480)
+    start = time.time()
+    [r] = rsa.attack([(strong, 65537, None), (weak, 65537, None)], timeout=4)
+    assert r.targets == (1,) and r.p * r.q == weak
+    assert time.time() - start < 5
+    assert rsa_attacks.pollard_rho(strong, rsa_attacks._Budget(None), max_steps=1 << 10) is None
+
+    n = getPrime(512) * getPrime(512)
+    assert rsa.attack((n, 3, pow(m, 3, n)))[0][::6] == ("small e root", m)
+    r = rsa.attack([(n, 17, pow(m, 17, n)), (n, 65537, pow(m, 65537, n))])[0]
+    assert (r.attack, r.targets, r.m) == ("common modulus", (0, 1), m)
+
+    big = m << 300
+    targets = []
+    for _ in range(3):
+        n = getPrime(256) * getPrime(256)
+        targets.append((n, 3, pow(big, 3, n)))
+    assert {(r.attack, r.m) for r in rsa.attack(targets)} == {("hastad broadcast", big)}
+
+    n = getPrime(32) * getPrime(40)
+    r = rsa.attack((n, 65537), timeout=10)[0]
+    assert r.attack in ("pollard p-1", "pollard rho") and r.p * r.q == n
+
+def test_rsa_batch_gcd(tmp_path, monkeypatch):
+    from Crypto.Util.number import getPrime
+    moduli = [getPrime(128) * getPrime(128) for _ in range(20)]
+    shared = getPrime(128)
+    moduli[3], moduli[11] = shared * getPrime(128), shared * getPrime(128)
+    moduli.append(moduli[7])
+    path = tmp_path / "moduli.txt"
+    path.write_text("# collected keys\n" + "\n".join(hex(n) if i % 2 else str(n) for i, n in enumerate(moduli)))
+
+    found = rsa.batch_gcd(path)
+    assert [(i, g) for i, _, g in found] == [(3, shared), (7, moduli[7]), (11, shared), (20, moduli[7])]
+    assert rsa.batch_gcd(moduli, spill_dir=tmp_path) == found
+
+    monkeypatch.setattr(rsa_attacks, "gmpy2", None)
+    monkeypatch.setattr(rsa_attacks, "GMPY2_WARN_AT", len(moduli))
+    with pytest.warns(RuntimeWarning, match="gmpy2"):
+        assert rsa.batch_gcd(moduli) == found
@@ -9,3 +9,20 @@ def test_playfair():
     normalized = text.replace("J", "I").upper()
     assert rt.startswith(normalized)
 
+
+def test_playfair_crack_short(dickens):
+    # 194 letters, about as short as the search still finds the square
+    ct = playfair.encrypt(dickens[:dickens.index(", it was the winter")], "QUEEN ANNE")
+    for seed in (1, 2, 3):
+        key, rt, _ = playfair.crack(ct, seed=seed)[0]
+        # any cyclic shift of the square is the same key
+        assert rt == playfair.decrypt(ct, "QUEEN ANNE")
+        assert playfair.encrypt(rt, key) == ct
+
+def test_playfair_cipher():
+    cipher = playfair.PlayfairCipher("playfair example")
+    assert cipher.square == "PLAYFIREXMBCDGHKNOQSTUVWZ"
+    ct = cipher.encrypt("Hide the gold in the tree stump")
+    assert ct == "BMODZBXDNABEKUDMUIXMMOUVIF"
+    assert cipher.decrypt(ct) == "HIDETHEGOLDINTHETREXESTUMP"
+    assert playfair.encrypt("Hide the gold in the tree stump", "playfair example") == ct
@@ -11,3 +11,10 @@ def autokey_test_vigenere():
     key = "KEY"
     ct = autokey_vigenere.encrypt(text, key)
     assert autokey_vigenere.decrypt(ct, key) == text
+
+def test_vigenere_crack(pride):
+    ct = vigenere.encrypt(pride, "LEMON")
+    assert vigenere.key_lengths(ct)[0][0] == 5
+    key, rt, _ = vigenere.crack(ct)[0]
+    assert key == "LEMON"
+    assert rt == pride
@@ -1,3 +1,6 @@
+import pickle
+import pytest
+from Crypto.Cipher import ARC4
 from pydecodr.ciphers.stream import xor, repeating_xor, rc4
 
 def text_xor_roundtrip():
@@ -15,6 +18,9 @@ def test_repeating_xor_roundtrip():
     pt = "HACKCLUB"
     ct = repeating_xor.encrypt(pt, key)
     assert repeating_xor.decrypt(ct, key) == pt
+    assert repeating_xor.decrypt(repeating_xor.encrypt(pt, b"k3y"), b"k3y") == pt
+    with pytest.raises(ValueError):
+        repeating_xor.encrypt(pt, b"")
 
 def test_rc4():
     pt = "Plaintext"
@@ -23,3 +29,52 @@ def test_rc4():
     assert rc4.encrypt(pt, key).lower() == expected
     assert rc4.decrypt(expected, key) == pt
 
+def test_rc4_state():
+    state = rc4.RC4State("Key")
+    resumed = state.copy()
+    head = state.process(b"Plain")
+    assert head + state.process(memoryview(b"text")) == bytes.fromhex("bbf316e8d940af0ad3")
+    resumed.skip(5)
+    assert resumed.process(bytearray(b"text")) == bytes.fromhex("40af0ad3")
+    buf = bytearray(b"Plaintext")
+    rc4.RC4State("Key").process_into(buf)
+    assert buf.hex() == "bbf316e8d940af0ad3"
+    pt = "drop me"
+    assert rc4.decrypt(rc4.encrypt(pt, "k", drop=768), "k", drop=768) == pt
+
+    state = rc4.RC4State("Key", drop=3)
+    state.keystream(1000)
+    saved = pickle.loads(pickle.dumps(state))
+    state.skip(70000)
+    tail = state.keystream(16)
+    saved.skip(70000)
+    assert saved.offset == 71003 and saved.keystream(16) == tail
+    assert tail == ARC4.new(b"Key", drop=71003).encrypt(bytes(16))
+
+def test_xor_crack():
+    pt = b"Cooking MC's like a pound of bacon"
+    ct = bytes(b ^ 0x58 for b in pt)
+    key, rt, _ = xor.crack(ct, limit=1)[0]
+    assert (key, rt) == (0x58, pt)
+    assert xor.crack(memoryview(ct), limit=1)[0][0] == 0x58
+    assert xor.crack(ct.hex(), limit=1)[0][0] == 0x58
+
+def test_repeating_xor_crack():
+    pt = (b"Burning 'em, if you ain't quick and nimble. I go crazy when I hear a cymbal "
+          b"and a high hat with a souped up tempo. I'm on a roll, it's time to go solo.")
+    ct = repeating_xor._xor_repeat(pt, b"ICE")
+    key, rt, _ = repeating_xor.crack(ct, limit=1)[0]
+    assert (key, rt) == (b"ICE", pt)
+    assert repeating_xor.key_sizes(ct, top=1)[0][0] % 3 == 0
+
+def test_rc4_crack(tmp_path):
+    words = tmp_path / "words.txt"
+    words.write_bytes(b"".join(b"guess%d\n" % i for i in range(500)) + b"hunter2\r\nlast\n")
+    ct = rc4.encrypt("flag{rc4_is_weak}", "hunter2")
+    [(key, pt, _)] = rc4.crack(ct, words, "flag{")
+    assert (key, pt) == (b"hunter2", b"flag{rc4_is_weak}")
+    assert rc4.crack(bytes.fromhex(ct), words, b"flag{", workers=2, first=True)[0][0] == b"hunter2"
+    ct = rc4.encrypt("flag{rc4_is_weak}", "hunter2", drop=768)
+    assert rc4.crack(ct, words, "flag{") == []
+    [(key, pt, _)] = rc4.crack(ct, words, "flag{", drop=768)
+    assert (key, pt) == (b"hunter2", b"flag{rc4_is_weak}")
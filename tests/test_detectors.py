@@ -12,3 +12,18 @@ def test_file_magic(tmp_path):
     p.write_bytes(b"\x89PNG\r\n\x1a\n" + b"readadadakdjhakdhaskjd")
     assert file_magic.detect_file(str(p)) == "PNG image"
 
+
+def test_try_decode_candidates():
+    results = autodetect.try_decode_candidates("SGVsbG8gd29ybGQ=", limit=3)
+    assert len(results) == 3
+    assert results[0][:2] == ("base64", "Hello world")
+    assert results[0][2] >= results[1][2] >= results[2][2]
+
+    ranked = autodetect.try_decode_candidates("Hello%20world%21", limit=1)
+    assert ranked[0][:2] == ("url", "Hello world!")
+
+    shifted = autodetect.try_decode_candidates("Wkh txlfn eurzq ira mxpsv ryhu wkh odcb grj", limit=1)
+    assert shifted[0][:2] == ("caesar:3", "The quick brown fox jumps over the lazy dog")
+    blob = bytes(range(256)).decode("latin-1") * 16
+    assert not any(name.startswith(("caesar", "rot13", "atbash"))
+                   for name, _, _ in autodetect.try_decode_candidates(blob))
@@ -0,0 +1,28 @@
+from pydecodr.utils import runner, scoring
+
+def _task(seed, offset):
+    assert scoring.quadgram_table().shape == (26 ** 4,)
+    return float(seed % 7 + offset), seed % 7
+
+def test_run_restarts():
+    best = runner.run_restarts(_task, 20, (1.0,), limit=3)
+    assert best == [(7.0, 6), (6.0, 5), (5.0, 4)]
+
+    parallel = runner.run_restarts(_task, 20, (1.0,), workers=2, limit=3)
+    assert parallel == best
+
+    early = runner.run_restarts(_task, 20, (1.0,), target=3.0)
+    assert early == [(3.0, 2), (2.0, 1), (1.0, 0)]
+
+    same = lambda result: 0
+    assert runner.run_restarts(_task, 20, (1.0,), confirm=2, key=same) == [(2.0, 1)]
+    assert runner.run_restarts(_task, 20, (1.0,), confirm=2, key=same, confirm_above=5.0) == [(5.0, 4)]
+
+def _chunk_task(chunk, divisor):
+    return [n for n in range(*chunk) if n % divisor == 0]
+
+def test_run_chunks():
+    chunks = [(0, 10), (10, 20), (20, 30)]
+    assert runner.run_chunks(_chunk_task, chunks, (7,)) == [0, 7, 14, 21, 28]
+    assert sorted(runner.run_chunks(_chunk_task, chunks, (7,), workers=2)) == [0, 7, 14, 21, 28]
+    assert runner.run_chunks(_chunk_task, chunks, (7,), first=True) == [0, 7]
@@ -0,0 +1,33 @@
+import numpy as np
+from pydecodr.utils import scoring
+
+def test_quadgram_scores():
+    english = "DEFENDTHEEASTWALLOFTHECASTLE"
+    shuffled = "EFLTSAETWDHCEOLTEENHDEFATSAL"
+    assert scoring.quadgram_score(english) > scoring.quadgram_score(shuffled)
+
+    rows = np.stack([scoring.letter_indices(english), scoring.letter_indices(shuffled)])
+    batch = scoring.quadgram_scores(rows)
+    assert np.allclose(batch, [scoring.quadgram_score(english), scoring.quadgram_score(shuffled)])
+
+def test_unlisted_quadgrams():
+    # both missing from the table, only one is built from common parts
+    assert scoring.quadgram_score("LFIX") > scoring.quadgram_score("QZXJ")
+    assert scoring.quadgram_score("LFIX") < scoring.quadgram_score("TION")
+
+def test_score_text():
+    assert scoring.score_text("attack at dawn and hold the bridge") > scoring.score_text("haahjr ha khdu huk ovsk aol iypknl")
+
+def test_incremental_fitness():
+    cipher = scoring.letter_indices("DEFENDTHEEASTWALLOFTHECASTLE")
+    key = np.arange(26)
+    fit = scoring.IncrementalFitness(cipher, key)
+    base = fit.score
+    assert np.isclose(base, scoring.quadgram_score(cipher))
+
+    fit.swap(4, 19)
+    key[[4, 19]] = key[[19, 4]]
+    assert np.isclose(fit.score, scoring.quadgram_score(key[cipher]))
+
+    assert fit.revert() == base
+    assert (fit.key == np.arange(26)).all()